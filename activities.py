@@ -1,25 +1,118 @@
 import os
-import csv
+import json
+import hashlib
+import time
+import asyncio
+import logging
+import tempfile
+import zlib
 import datetime as dt
-from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from operator import attrgetter
+from collections import OrderedDict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from dataclasses import dataclass, asdict, fields as dataclass_fields
+from typing import Optional, Dict, Any, Callable, Iterable, Awaitable
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import aiohttp
 
+from conversations import ConversationRouter, FlowBusy, FlowEntry, FlowManager
+from bulk import GzipCsvParts, ImportStats, iter_csv_records, iter_lines, read_csv_logs
+from csv_sink import CsvSink
+from dedupe import DedupeIndex
+from digest import LogDigest
+from outbox import Outbox, OutboxWorker, CircuitBreaker
+from reminders import ReminderScheduler, ReminderStore
+from sessions import SessionStore
+from sinks import Sink, SinkPipeline, SinkResult
+from store import ActivityStore, ROLLUP_METRICS, period_start
+import metrics
+
 
 # ----------------- CONFIG VIA ENV -----------------
 WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").strip()
 WEBHOOK_AUTH_SECRET = os.getenv("WEBHOOK_AUTH_SECRET", "").strip()
 
+# Shared HTTP client for webhook delivery (one pooled, keep-alive session per cog)
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", "10"))                  # total seconds per POST
+WEBHOOK_CONNECT_TIMEOUT = float(os.getenv("WEBHOOK_CONNECT_TIMEOUT", "5"))   # seconds to open a connection
+WEBHOOK_CONN_LIMIT = int(os.getenv("WEBHOOK_CONN_LIMIT", "100"))             # total pooled connections
+WEBHOOK_CONN_LIMIT_PER_HOST = int(os.getenv("WEBHOOK_CONN_LIMIT_PER_HOST", "20"))
+WEBHOOK_KEEPALIVE = float(os.getenv("WEBHOOK_KEEPALIVE", "30"))              # idle seconds before closing a pooled connection
+
 GUILD_ID = os.getenv("GUILD_ID", "").strip()           # speeds up slash-command sync if set
 LOG_CHANNEL_ID = int(os.getenv("LOG_CHANNEL_ID", "0"))  # 0 = disabled
+# Digest mode: one aggregated log-channel post every N minutes / M logs instead of one post per log
+LOG_DIGEST = os.getenv("LOG_DIGEST", "").strip().lower() in ("1", "true", "yes", "on")
+LOG_DIGEST_MINUTES = float(os.getenv("LOG_DIGEST_MINUTES", "10"))
+LOG_DIGEST_MAX_ENTRIES = int(os.getenv("LOG_DIGEST_MAX_ENTRIES", "50"))
 QUESTION_TIMEOUT = int(os.getenv("QUESTION_TIMEOUT", "180"))
 
+# Durable outbox: every log is written locally first, then delivered to the webhook in the background
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.sqlite3").strip()  # leave empty to post inline instead
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "4"))      # parallel deliveries while draining
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "2"))        # seconds; doubles per failed attempt (jittered)
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "300"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "50"))   # failed deliveries before a log is dead-lettered (0 = never)
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))          # consecutive failures before pausing delivery
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "60"))             # seconds before a probe delivery is attempted
+
+# Resumable flows: partial answers are checkpointed after every question and picked up on the next DM
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "sessions.sqlite3").strip()  # leave empty to disable
+SESSION_TTL = int(os.getenv("SESSION_TTL", "21600"))                # seconds a half-finished log stays resumable
+
+# Admission control: one flow per rep, at most MAX_ACTIVE_FLOWS running at once (0 = unlimited); the rest wait in line
+MAX_ACTIVE_FLOWS = int(os.getenv("MAX_ACTIVE_FLOWS", "200"))
+FLOW_QUEUE_TIMEOUT = int(os.getenv("FLOW_QUEUE_TIMEOUT", "900"))    # seconds a rep waits for a slot before giving up
+FLOW_IDLE_EVICT = int(os.getenv("FLOW_IDLE_EVICT", "120"))          # pause flows idle this long while others wait (0 = never)
+
+# Per-sink timeout for the store / CSV / log-channel sinks (the webhook sink uses the webhook timeouts)
+SINK_TIMEOUT = float(os.getenv("SINK_TIMEOUT", "15"))
+
+# Optional batching (needs the outbox): send up to N records per POST as one JSON array
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "1"))      # 1 = one POST per log (default)
+WEBHOOK_BATCH_MS = int(os.getenv("WEBHOOK_BATCH_MS", "2000"))       # max wait for a partial batch to fill
+
+# Local activity history + rollups behind /stats and /leaderboard
+ACTIVITY_DB_PATH = os.getenv("ACTIVITY_DB_PATH", "activity.sqlite3").strip()  # leave empty to disable
+LOCAL_TIMEZONE = os.getenv("LOCAL_TIMEZONE", "UTC").strip() or "UTC"         # decides which work day a log belongs to
+LOCAL_TZ = ZoneInfo(LOCAL_TIMEZONE)
+
+# Nicknames remembered for reps whose flows run in DMs (where only the User, not the Member, is known)
+DISPLAY_NAME_CACHE = int(os.getenv("DISPLAY_NAME_CACHE", "2048"))
+
+# Resubmissions: the latest log per rep and work day is remembered (LRU + TTL, backed by the activity store)
+DEDUPE_CACHE_SIZE = int(os.getenv("DEDUPE_CACHE_SIZE", "4096"))
+DEDUPE_TTL = int(os.getenv("DEDUPE_TTL", "129600"))                 # 36h covers a work day in any timezone
+
+# Admin /import and /export
+IMPORT_CONCURRENCY = int(os.getenv("IMPORT_CONCURRENCY", "4"))      # imported rows being delivered at once
+IMPORT_PROGRESS_SECONDS = float(os.getenv("IMPORT_PROGRESS_SECONDS", "5"))
+EXPORT_PART_BYTES = int(os.getenv("EXPORT_PART_BYTES", "8000000"))  # compressed size per attachment
+
+# Daily reminders for reps who opt in with /reminders and haven't logged yet
+REMINDER_DB_PATH = os.getenv("REMINDER_DB_PATH", "reminders.sqlite3").strip()   # leave empty to disable
+REMINDER_DEFAULT_TIME = os.getenv("REMINDER_DEFAULT_TIME", "6:00 PM").strip()
+REMINDER_DAYS = os.getenv("REMINDER_DAYS", "mon,tue,wed,thu,fri,sat").strip().lower()
+REMINDER_RATE = float(os.getenv("REMINDER_RATE", "5"))              # reminder DMs per second, at most
+REMINDER_BATCH = int(os.getenv("REMINDER_BATCH", "10"))             # DMs sent concurrently per batch
+REMINDER_CATCHUP = int(os.getenv("REMINDER_CATCHUP", "10800"))      # after downtime, still send reminders this late (s)
+
+# Slash-command sync: the last synced command-tree hash per target, so reconnects skip unchanged syncs
+TREE_HASH_PATH = os.getenv("TREE_HASH_PATH", "command_tree.json").strip()  # leave empty to always sync
+
+# Metrics: Prometheus text at http://METRICS_HOST:METRICS_PORT/metrics (0 = no endpoint; !metrics still works)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1").strip()
+
 # Optional CSV fallback if you want local logging too (only meaningful on persistent disk)
 CSV_FALLBACK_PATH = os.getenv("CSV_FALLBACK_PATH", "").strip()  # leave empty to disable
+CSV_ROTATE = os.getenv("CSV_ROTATE", "none").strip().lower()      # none | daily | size
+CSV_MAX_BYTES = int(os.getenv("CSV_MAX_BYTES", "50000000"))       # size rotation threshold
+CSV_FLUSH_INTERVAL = float(os.getenv("CSV_FLUSH_INTERVAL", "1"))  # seconds between buffered flushes
+CSV_FLUSH_ROWS = int(os.getenv("CSV_FLUSH_ROWS", "200"))          # or flush once this many rows are buffered
 
 
 # ----------------- DATA MODEL -----------------
@@ -62,22 +155,662 @@ class DailyTotals:
     lead_appts_booked: int = 0
 
     # Reliability / Security
-    idempotency_key: str = ""
+    idempotency_key: str = ""           # rep, day and content_hash (plus a revision number once it replaces an earlier log)
+    content_hash: str = ""
+    supersedes_key: str = ""            # set when this log replaces the rep's earlier log for the same day
     auth_secret: str = ""
 
 
+# ----------------- FLOW FIELDS -----------------
+# One entry per question, in the order the DM flow asks them. The same table drives the
+# conversational flow, the pasted `key: value` block, and the /logquick slash options.
+@dataclass(frozen=True)
+class Field:
+    key: str                                   # DailyTotals attribute (or flow-only flag like had_cold)
+    kind: str                                  # "text" | "int" | "float" | "choice" | "yesno"
+    prompt: str
+    choices: tuple[str, ...] = ()
+    aliases: tuple[str, ...] = ()              # extra keys accepted in a pasted block
+    when: Optional[Callable[[Dict[str, Any]], bool]] = None
+
+
+KNOCKS_CATEGORIES = ("CODENOX", "LEADSOURCE", "COLDKNOCK", "MIXED")
+
+FIELDS: list[Field] = [
+    # Identity + timing
+    Field("start_time", "text", "Start time (e.g., `9:00 AM`): ", aliases=("start",)),
+    Field("end_time", "text", "End time (e.g., `5:30 PM`): ", aliases=("end",)),
+    # Totals first (whole day picture)
+    Field("knocks_total", "int", "Total NOx (all knocks today): ", aliases=("nox", "knocks")),
+    Field(
+        "knocks_category", "choice",
+        "Primary knocks category? Reply with `CodeNOx`, `LeadSource`, or `ColdKnock`. If you did both cold and lead today, reply `Mixed`.",
+        choices=KNOCKS_CATEGORIES, aliases=("category",),
+    ),
+    Field(
+        "knocks_source_detail", "text",
+        "Lead source/batch? (e.g., `Gamechanger`, `Silver`, `Integrity Preferred`): ",
+        aliases=("source", "lead_source"),
+        when=lambda v: v.get("knocks_category") in ("LEADSOURCE", "MIXED"),
+    ),
+    Field("presentations_no_sale", "int", "Presentations with **no sale** (total today): ", aliases=("pres_no_sale", "presentations")),
+    Field("not_interested", "int", "`Not interested` count (total today): ", aliases=("ni",)),
+    Field("sales_count", "int", "Sales closed (count, total today): ", aliases=("sales",)),
+    Field("ap_amount", "float", "Total AP (e.g., `1243.50`): ", aliases=("ap",)),
+    Field("carrier", "text", "Carrier (e.g., `Aetna`, `Americo`, `MOO`, `Nassau`): "),
+    Field("dials_made", "int", "Dials made (total today): ", aliases=("dials",)),
+    Field("appts_booked_total", "int", "Appointments booked (total today): ", aliases=("appts",)),
+    Field("appts_booked_from_dials", "int", "Appointments booked **from dials** (subset of total): ", aliases=("appts_from_dials",)),
+    # Optional: Cold Knock breakdown
+    Field("had_cold", "yesno", "Did you do **Cold Knocks** today? (`yes`/`no`): ", aliases=("cold",)),
+    Field("cold_knocks_total", "int", "Cold Knocks — total knocks: ", when=lambda v: v.get("had_cold")),
+    Field("cold_presentations_no_sale", "int", "Cold Knocks — presentations with no sale: ", when=lambda v: v.get("had_cold")),
+    Field("cold_not_interested", "int", "Cold Knocks — not interested count: ", when=lambda v: v.get("had_cold")),
+    Field("cold_sales_count", "int", "Cold Knocks — sales count: ", when=lambda v: v.get("had_cold")),
+    Field("cold_ap_amount", "float", "Cold Knocks — AP amount (e.g., `500`): ", when=lambda v: v.get("had_cold")),
+    Field("cold_appts_booked", "int", "Cold Knocks — appointments booked: ", when=lambda v: v.get("had_cold")),
+    # Optional: Lead-source breakdown
+    Field("had_leads", "yesno", "Did you work **Lead-source knocks** today? (`yes`/`no`): ", aliases=("lead", "leads")),
+    Field("lead_knocks_total", "int", "Lead-source — total knocks: ", when=lambda v: v.get("had_leads")),
+    Field("lead_presentations_no_sale", "int", "Lead-source — presentations with no sale: ", when=lambda v: v.get("had_leads")),
+    Field("lead_not_interested", "int", "Lead-source — not interested count: ", when=lambda v: v.get("had_leads")),
+    Field("lead_sales_count", "int", "Lead-source — sales count: ", when=lambda v: v.get("had_leads")),
+    Field("lead_ap_amount", "float", "Lead-source — AP amount (e.g., `750`): ", when=lambda v: v.get("had_leads")),
+    Field("lead_appts_booked", "int", "Lead-source — appointments booked: ", when=lambda v: v.get("had_leads")),
+]
+
+FIELDS_BY_NAME: Dict[str, Field] = {}
+for _f in FIELDS:
+    for _name in (_f.key, *_f.aliases):
+        FIELDS_BY_NAME[_name] = _f
+
+_DATACLASS_FIELDS = {f.name for f in dataclass_fields(DailyTotals)}
+# CSV layout: header and row extractor computed once from the DailyTotals field list
+CSV_HEADER = [f.name for f in dataclass_fields(DailyTotals)]
+csv_row = attrgetter(*CSV_HEADER)
+PAYLOAD_FIELDS = [f.key for f in FIELDS if f.key in _DATACLASS_FIELDS]
+FLOAT_FIELDS = [f.key for f in FIELDS if f.kind == "float"]
+
+# What `!logtemplate` hands out; breakdown lines are only needed when `cold`/`lead` is yes
+LOG_TEMPLATE = (
+    "start: 9:00 AM\n"
+    "end: 5:30 PM\n"
+    "nox: 0\n"
+    "category: CodeNOx\n"
+    "source: \n"
+    "pres_no_sale: 0\n"
+    "not_interested: 0\n"
+    "sales: 0\n"
+    "ap: 0\n"
+    "carrier: \n"
+    "dials: 0\n"
+    "appts: 0\n"
+    "appts_from_dials: 0\n"
+    "cold: no\n"
+    "lead: no"
+)
+
+
+# ----------------- VALIDATION -----------------
+# Shared by the _ask_* helpers and the fast paths so every entry point accepts the same answers.
+def parse_int(content: str) -> Optional[int]:
+    try:
+        val = int(content.strip().lower().replace(",", ""))
+    except ValueError:
+        return None
+    return val if val >= 0 else None
+
+
+def parse_float(content: str) -> Optional[float]:
+    try:
+        val = float(content.strip().lower().replace(",", ""))
+    except ValueError:
+        return None
+    return val if val >= 0 else None
+
+
+def parse_choice(content: str, choices: list[str] | tuple[str, ...]) -> Optional[str]:
+    content = content.strip().upper()
+    return content if content in [c.upper() for c in choices] else None
+
+
+def parse_yes_no(content: str) -> Optional[bool]:
+    content = content.strip().lower()
+    if content in ("y", "yes"): return True
+    if content in ("n", "no"): return False
+    return None
+
+
+def parse_clock(content: str) -> Optional[dt.time]:
+    """`18:00`, `6 PM`, `6:30pm` -> time of day."""
+    content = content.strip().upper().replace(" ", "").replace(".", "")
+    for fmt in ("%H:%M", "%I:%M%p", "%I%p"):
+        try:
+            return dt.datetime.strptime(content, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_weekdays(content: str) -> set[int]:
+    names = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+    return {names.index(d.strip()[:3]) for d in content.split(",") if d.strip()[:3] in names}
+
+
+def parse_field(field: Field, content: str) -> Optional[Any]:
+    """Validate one raw answer for ``field``; None means invalid (or blank)."""
+    if field.kind == "int":
+        return parse_int(content)
+    if field.kind == "float":
+        return parse_float(content)
+    if field.kind == "choice":
+        return parse_choice(content, field.choices)
+    if field.kind == "yesno":
+        return parse_yes_no(content)
+    return content.strip() or None
+
+
+def field_named(name: str) -> Optional[Field]:
+    """The field a pasted key or slash option names (any alias, case / spacing insensitive)."""
+    return FIELDS_BY_NAME.get(name.strip().lower().replace(" ", "_").replace("-", "_"))
+
+
+def parse_log_pairs(
+    pairs: Iterable[tuple[str, Any]], sections_default_no: bool = False,
+) -> tuple[Dict[str, Any], list[str]]:
+    """Validate ``(name, raw value)`` pairs into flow values.
+
+    Returns (values, errors). Invalid or blank fields are left out of ``values`` so the flow
+    re-asks just those. A cold / lead-source section counts as "yes" when the input includes
+    any of its fields. Otherwise it is left for the flow to ask, unless ``sections_default_no``
+    (a form where leaving the section out means "no", like /logquick).
+    """
+    values: Dict[str, Any] = {}
+    errors: list[str] = []
+    seen: set[str] = set()
+    for name, raw in pairs:
+        field = field_named(name)
+        if field is None or raw is None:
+            continue
+        seen.add(field.key)
+        raw = str(raw)
+        if not raw.strip():
+            continue
+        val = parse_field(field, raw)
+        if val is None:
+            errors.append(f"`{field.key}` ({raw.strip()[:40]})")
+        else:
+            values[field.key] = val
+    if not seen:
+        return {}, []
+    for flag, prefix in (("had_cold", "cold_"), ("had_leads", "lead_")):
+        if flag not in seen:
+            section_seen = any(k.startswith(prefix) for k in seen)
+            if section_seen or sections_default_no:
+                values[flag] = section_seen
+    return values, errors
+
+
+def parse_log_block(text: str) -> tuple[Dict[str, Any], list[str]]:
+    """Parse a pasted ``key: value`` block (see LOG_TEMPLATE) into flow values."""
+    pairs = []
+    for line in text.splitlines():
+        name, sep, raw = line.partition(":")
+        if sep:
+            pairs.append((name, raw))
+    return parse_log_pairs(pairs)
+
+
+# ----------------- DATES & RANGES -----------------
+def local_today() -> dt.date:
+    return dt.datetime.now(LOCAL_TZ).date()
+
+
+def local_date(timestamp_utc: str) -> dt.date:
+    ts = dt.datetime.fromisoformat(timestamp_utc.rstrip("Z")).replace(tzinfo=dt.timezone.utc)
+    return ts.astimezone(LOCAL_TZ).date()
+
+
+def work_date(p: DailyTotals) -> dt.date:
+    """The local calendar day a log counts toward (from its UTC submission time)."""
+    return local_date(p.timestamp_utc)
+
+
+# Identify the submission rather than describe the day, so they stay out of the content hash
+_UNHASHED_FIELDS = {"timestamp_utc", "discord_display_name", "idempotency_key", "content_hash", "supersedes_key", "auth_secret"}
+
+
+def content_hash(p: DailyTotals, day: dt.date) -> str:
+    """Canonical hash of a log's answers for one rep and work day. Text is compared with case and
+    whitespace folded and money to the cent, so re-entering the same log gives the same hash."""
+    canon: Dict[str, Any] = {"user": p.discord_user_id, "work_date": day.isoformat()}
+    for f in dataclass_fields(DailyTotals):
+        if f.name in _UNHASHED_FIELDS:
+            continue
+        value = getattr(p, f.name)
+        if isinstance(value, str):
+            value = " ".join(value.split()).casefold()
+        elif isinstance(value, float):
+            value = round(value, 2)
+        canon[f.name] = value
+    return hashlib.sha256(json.dumps(canon, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def make_payload(user_id: str, display_name: str, timestamp_utc: str, values: Dict[str, Any]) -> DailyTotals:
+    """Build the DailyTotals for validated flow values, keyed by its content hash."""
+    # Skipped sections (no cold / no lead-source work, no lead source detail) fall back to the dataclass defaults
+    totals = {k: values[k] for k in PAYLOAD_FIELDS if k in values}
+    totals.setdefault("knocks_source_detail", "")
+    for k in FLOAT_FIELDS:
+        if k in totals:
+            totals[k] = float(totals[k])
+    payload = DailyTotals(
+        timestamp_utc=timestamp_utc,
+        discord_user_id=user_id,
+        discord_display_name=display_name,
+        auth_secret=WEBHOOK_AUTH_SECRET or "",
+        **totals,
+    )
+    day = work_date(payload)
+    payload.content_hash = content_hash(payload, day)
+    payload.idempotency_key = f"{user_id}-{day.isoformat()}-{payload.content_hash[:16]}"
+    return payload
+
+
+def supersede(payload: DailyTotals, previous_key: str):
+    """Mark ``payload`` as replacing the log keyed ``previous_key``. The key gets the next revision
+    number, so going back to earlier numbers (A -> B -> A) never reuses a key still queued or stored."""
+    _, sep, revision = previous_key.rpartition("-r")
+    revision = int(revision) + 1 if sep and revision.isdigit() else 2
+    payload.supersedes_key = previous_key
+    payload.idempotency_key = f"{payload.idempotency_key}-r{revision}"
+
+
+# ----------------- IMPORT / EXPORT -----------------
+# Answers every imported row needs (the questions the DM flow always asks)
+IMPORT_REQUIRED = [f.key for f in FIELDS if f.when is None and f.key in _DATACLASS_FIELDS]
+# The CSV fallback layout minus the webhook secret
+EXPORT_HEADER = [name for name in CSV_HEADER if name != "auth_secret"]
+
+
+def stored_log(p: DailyTotals) -> Dict[str, Any]:
+    """A log as the activity store keeps it. The webhook secret only travels on the outbox / webhook path."""
+    data = asdict(p)
+    del data["auth_secret"]
+    return data
+
+
+def parse_import_row(row: Dict[str, str]) -> tuple[Optional[DailyTotals], Optional[str]]:
+    """Validate one CSV row in the DailyTotals layout (as the CSV fallback and /export write it).
+
+    Answers go through the same parsers as the DM flow. Returns (payload, None) or (None, error).
+    """
+    user_id = (row.get("discord_user_id") or "").strip()
+    if not user_id.isdigit():
+        return None, f"bad discord_user_id `{user_id[:30]}`"
+    stamp = (row.get("timestamp_utc") or "").strip()
+    try:
+        ts = dt.datetime.fromisoformat(stamp.rstrip("Z"))
+    except ValueError:
+        return None, f"bad timestamp_utc `{stamp[:30]}`"
+    if ts.tzinfo:
+        ts = ts.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    values, errors = parse_log_pairs((k, v) for k, v in row.items() if k in _DATACLASS_FIELDS)
+    if errors:
+        return None, "invalid " + ", ".join(errors)
+    missing = [k for k in IMPORT_REQUIRED if k not in values]
+    if missing:
+        return None, "missing " + ", ".join(missing)
+    name = (row.get("discord_display_name") or "").strip() or user_id
+    return make_payload(user_id, name, ts.isoformat(timespec="seconds") + "Z", values), None
+
+
+STAT_RANGES = ("today", "yesterday", "week", "last_week", "month", "last_month", "year", "all")
+
+
+def resolve_range(name: str, today: Optional[dt.date] = None) -> tuple[Optional[str], Optional[str]]:
+    """Map a /stats or /leaderboard range to (rollup period, period start).
+
+    A None period means "sum the monthly rollups from start onward" (year / all time).
+    """
+    today = today or local_today()
+    if name == "yesterday":
+        return "day", period_start("day", today - dt.timedelta(days=1))
+    if name == "week":
+        return "week", period_start("week", today)
+    if name == "last_week":
+        return "week", period_start("week", today - dt.timedelta(days=7))
+    if name == "month":
+        return "month", period_start("month", today)
+    if name == "last_month":
+        return "month", period_start("month", today.replace(day=1) - dt.timedelta(days=1))
+    if name == "year":
+        return None, today.replace(month=1, day=1).isoformat()
+    if name == "all":
+        return None, ""
+    return "day", period_start("day", today)
+
+
+def range_dates(name: str, today: Optional[dt.date] = None) -> tuple[Optional[str], Optional[str]]:
+    """[start, end) work dates for a range; None means unbounded."""
+    period, start = resolve_range(name, today)
+    if not start:
+        return None, None
+    first = dt.date.fromisoformat(start)
+    if period == "day":
+        end = first + dt.timedelta(days=1)
+    elif period == "week":
+        end = first + dt.timedelta(days=7)
+    elif period == "month":
+        end = (first.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+    else:
+        return start, None
+    return start, end.isoformat()
+
+
+# ----------------- INSTRUMENTATION -----------------
+class _RateLimitCounter(logging.Handler):
+    """Counts 429s from discord.py's log records (it handles them internally and only logs them).
+
+    Every 429 logs one "... responded with 429 ..." warning. A global one is followed by
+    "Global rate limit has been hit", which moves that 429 from the route to the global count;
+    both are logged back to back without yielding to the event loop, so no scrape sees the interim.
+    """
+
+    def __init__(self, counter: metrics.Counter):
+        super().__init__(level=logging.WARNING)
+        self.counter = counter
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if "responded with 429" in message:
+            self.counter.inc(scope="route")
+        elif message.startswith("Global rate limit has been hit"):
+            self.counter.inc(-1, scope="route")
+            self.counter.inc(scope="global")
+
+
+# ----------------- UI -----------------
+class PasteLogModal(discord.ui.Modal, title="Daily Log"):
+    """One-form fast path: the whole log as a `key: value` block, prefilled with the template."""
+
+    block = discord.ui.TextInput(
+        label="Your log — one `key: value` per line",
+        style=discord.TextStyle.paragraph,
+        default=LOG_TEMPLATE,
+        max_length=2000,
+    )
+
+    def __init__(self, cog: "ActivityCog"):
+        super().__init__()
+        self.cog = cog
+
+    async def on_submit(self, interaction: discord.Interaction):
+        prefill, errors = parse_log_block(self.block.value)
+        await interaction.response.send_message("Got it — check your DMs for your saved log.", ephemeral=True)
+        await self.cog._start_flow(interaction.user, reply_channel=None, prefill=prefill, prefill_errors=errors)
+
+
+class ReminderView(discord.ui.View):
+    """Buttons on reminder DMs. Registered once as a persistent view, so they keep working after restarts."""
+
+    def __init__(self, cog: "ActivityCog"):
+        super().__init__(timeout=None)
+        self.cog = cog
+
+    @discord.ui.button(label="Log today", emoji="📝", style=discord.ButtonStyle.primary, custom_id="activity:reminder:form")
+    async def log_form(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(PasteLogModal(self.cog))
+
+    @discord.ui.button(label="Step by step", style=discord.ButtonStyle.secondary, custom_id="activity:reminder:chat")
+    async def log_chat(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+        await self.cog._start_flow(interaction.user, reply_channel=None)
+
+
+# ----------------- COMMAND SYNC -----------------
+def _load_tree_hashes() -> Dict[str, str]:
+    try:
+        with open(TREE_HASH_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_tree_hashes(hashes: Dict[str, str]):
+    tmp = TREE_HASH_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+    os.replace(tmp, TREE_HASH_PATH)
+
+
 # ----------------- COG -----------------
 class ActivityCog(commands.Cog):
     """Conversational daily activity logging with webhook to Zapier."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._http: Optional[aiohttp.ClientSession] = None
+        self.outbox: Optional[OutboxWorker] = None
+        self.router = ConversationRouter()
+        self.flows = FlowManager(MAX_ACTIVE_FLOWS, FLOW_QUEUE_TIMEOUT, FLOW_IDLE_EVICT)
+        self.sessions: Optional[SessionStore] = None
+        self._saved_sessions: set[int] = set()   # users with a checkpoint on disk (O(1) check per DM)
+        self.csv_sink: Optional[CsvSink] = None
+        self.store: Optional[ActivityStore] = None
+        self._pipeline: Optional[SinkPipeline] = None
+        self.digest: Optional[LogDigest] = None
+        self.reminders: Optional[ReminderScheduler] = None
+        self._reminder_view: Optional[ReminderView] = None
+        self.dedupe = DedupeIndex(DEDUPE_CACHE_SIZE, DEDUPE_TTL)
+        self._display_names: OrderedDict[int, str] = OrderedDict()  # user id -> server nickname (LRU)
+        self._init_metrics()
+
+    # ---------- Lifecycle ----------
+    async def cog_load(self):
+        self._http = self._make_http_session()
+        self._lag_task = asyncio.create_task(metrics.watch_loop_lag(self.m_loop_lag), name="loop-lag")
+        logging.getLogger("discord.http").addHandler(self._rate_limit_counter)
+        if METRICS_PORT:
+            try:
+                self._metrics_runner = await metrics.serve(self.metrics, METRICS_HOST, METRICS_PORT)
+                print(f"[activities] Metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except OSError as e:
+                print("[activities] Metrics endpoint failed to start:", e)
+        if CSV_FALLBACK_PATH:
+            self.csv_sink = self._make_csv_sink()
+        if ACTIVITY_DB_PATH:
+            self.store = await asyncio.to_thread(ActivityStore, ACTIVITY_DB_PATH)
+            self.dedupe.loader = self._accepted_for_day
+        if WEBHOOK_URL and OUTBOX_PATH:
+            store = await asyncio.to_thread(Outbox, OUTBOX_PATH)
+            self.outbox = OutboxWorker(
+                store,
+                self._post_webhook,
+                concurrency=OUTBOX_CONCURRENCY,
+                base_delay=RETRY_BASE_DELAY,
+                max_delay=RETRY_MAX_DELAY,
+                max_attempts=OUTBOX_MAX_ATTEMPTS,
+                breaker=CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET),
+                post_batch=self._post_webhook_batch if WEBHOOK_BATCH_SIZE > 1 else None,
+                batch_size=WEBHOOK_BATCH_SIZE,
+                batch_linger=WEBHOOK_BATCH_MS / 1000,
+                on_dead_letter=self._on_dead_letter,
+            )
+            # Anything left from a previous run is replayed immediately
+            self.outbox.start()
+            pending = await asyncio.to_thread(store.pending)
+            if pending:
+                print(f"[activities] Replaying {pending} undelivered log(s) from outbox")
+            dead = await asyncio.to_thread(store.dead_letters)
+            if dead:
+                print(f"[activities] {dead} log(s) in the outbox were rejected by the webhook and won't be retried")
+        if SESSION_STORE_PATH:
+            self.sessions = await asyncio.to_thread(SessionStore, SESSION_STORE_PATH, SESSION_TTL)
+            await asyncio.to_thread(self.sessions.purge_expired)
+            self._saved_sessions = await asyncio.to_thread(self.sessions.user_ids)
+            if self._saved_sessions:
+                print(f"[activities] {len(self._saved_sessions)} in-progress log(s) can be resumed")
+            self._expire_sessions.start()
+        if LOG_CHANNEL_ID and LOG_DIGEST:
+            self.digest = LogDigest(
+                self._send_log_channel, LOG_DIGEST_MINUTES * 60, LOG_DIGEST_MAX_ENTRIES,
+                key=lambda p: (p.discord_user_id, work_date(p)),
+            )
+            self.digest.start()
+        self._pipeline = self._build_pipeline()
+        if MAX_ACTIVE_FLOWS > 0 and FLOW_IDLE_EVICT > 0:
+            self._evict_idle_flows.start()
+        if REMINDER_DB_PATH:
+            store = await asyncio.to_thread(ReminderStore, REMINDER_DB_PATH)
+            self.reminders = ReminderScheduler(
+                store,
+                self._send_reminder,
+                days=parse_weekdays(REMINDER_DAYS),
+                rate=REMINDER_RATE,
+                batch_size=REMINDER_BATCH,
+                catchup=REMINDER_CATCHUP,
+                on_result=lambda result: self.m_reminders.inc(result=result),
+            )
+            await self.reminders.start()
+            if len(self.reminders):
+                print(f"[activities] {len(self.reminders)} rep(s) get daily reminders")
+            self._reminder_view = ReminderView(self)
+            self.bot.add_view(self._reminder_view)
+
+    async def cog_unload(self):
+        self._evict_idle_flows.cancel()
+        if self.reminders is not None:
+            await self.reminders.close()
+            await asyncio.to_thread(self.reminders.store.close)
+            self.reminders = None
+        if self._reminder_view:
+            self._reminder_view.stop()
+            self._reminder_view = None
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        logging.getLogger("discord.http").removeHandler(self._rate_limit_counter)
+        if self._metrics_runner:
+            await self._metrics_runner.cleanup()
+            self._metrics_runner = None
+        # Let in-flight sink writes land before their stores are closed
+        if self._pipeline:
+            await self._pipeline.drain()
+        if self.digest:
+            # Post whatever is still buffered before going away
+            try:
+                await self.digest.close()
+            except Exception as e:
+                print("[activities] Final digest flush failed:", e)
+            self.digest = None
+        if self.store:
+            self.dedupe.loader = None
+            await asyncio.to_thread(self.store.close)
+            self.store = None
+        if self.csv_sink:
+            # Drains buffered rows and fsyncs
+            await asyncio.to_thread(self.csv_sink.close)
+            self.csv_sink = None
+        if self.sessions:
+            self._expire_sessions.cancel()
+            await asyncio.to_thread(self.sessions.close)
+            self.sessions = None
+        if self.outbox:
+            await self.outbox.stop()
+            await asyncio.to_thread(self.outbox.outbox.close)
+            self.outbox = None
+        if self._http and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
+    def _make_http_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=WEBHOOK_CONN_LIMIT,
+            limit_per_host=WEBHOOK_CONN_LIMIT_PER_HOST,
+            keepalive_timeout=WEBHOOK_KEEPALIVE,
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT, sock_connect=WEBHOOK_CONNECT_TIMEOUT)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            raise_for_status=False,
+            headers={"Content-Type": "application/json"},
+        )
+
+    def _init_metrics(self):
+        self.metrics = metrics.Registry()
+        m = self.metrics
+        self.m_prompt = m.histogram("activity_prompt_seconds", "Time from sending a question to receiving a valid answer")
+        self.m_reply_wait = m.histogram("activity_reply_wait_seconds", "Time spent waiting for each DM reply")
+        self.m_reply_timeouts = m.counter("activity_reply_timeouts_total", "Questions that timed out waiting for a reply")
+        self.m_webhook = m.histogram("activity_webhook_seconds", "Webhook POST latency")
+        self.m_webhook_status = m.counter("activity_webhook_responses_total", "Webhook responses by HTTP status (or error)")
+        self.m_csv = m.histogram("activity_csv_append_seconds", "Event-loop time spent in _append_csv")
+        self.m_sink = m.histogram("activity_sink_seconds", "Per-sink latency for finished logs")
+        self.m_sink_failures = m.counter("activity_sink_failures_total", "Sink failures and timeouts")
+        self.m_send = m.histogram("activity_discord_send_seconds", "Discord message send latency")
+        self.m_send_errors = m.counter("activity_discord_send_errors_total", "Discord sends that raised")
+        self.m_rate_limits = m.counter("activity_discord_rate_limits_total", "Discord 429 / rate-limit events seen by discord.py")
+        self.m_logs = m.counter("activity_logs_total", "Finished daily logs by result")
+        self.m_loop_lag = m.histogram("activity_event_loop_lag_seconds", "How late the event loop wakes a 0.5s sleeper")
+        m.gauge("activity_active_flows", "Conversations currently in progress", fn=lambda: len(self.router))
+        m.gauge("activity_queued_flows", "Reps waiting in line for a flow slot", fn=lambda: self.flows.waiting)
+        self.m_flow_queue_timeouts = m.counter("activity_flow_queue_timeouts_total", "Reps who gave up waiting for a flow slot")
+        self.m_reminders = m.counter("activity_reminders_total", "Reminder DMs by result (sent, failed, skipped)")
+        self.m_flows_evicted = m.counter("activity_flows_evicted_total", "Idle flows paused to make room for waiting reps")
+        self._lag_task: Optional[asyncio.Task] = None
+        self._metrics_runner = None
+        self._rate_limit_counter = _RateLimitCounter(self.m_rate_limits)
+
+    async def _send(self, channel: discord.abc.Messageable, content: str, **kwargs: Any):
+        t0 = time.perf_counter()
+        try:
+            return await channel.send(content, **kwargs)
+        except Exception:
+            self.m_send_errors.inc()
+            raise
+        finally:
+            self.m_send.observe(time.perf_counter() - t0)
+
+    def _observe_sink(self, result: SinkResult):
+        self.m_sink.observe(result.ms / 1000, sink=result.name)
+        if not result.ok:
+            self.m_sink_failures.inc(sink=result.name)
+
+    def _make_csv_sink(self) -> CsvSink:
+        return CsvSink(
+            CSV_FALLBACK_PATH,
+            CSV_HEADER,
+            rotate=CSV_ROTATE,
+            max_bytes=CSV_MAX_BYTES,
+            flush_interval=CSV_FLUSH_INTERVAL,
+            flush_rows=CSV_FLUSH_ROWS,
+        )
+
+    @property
+    def http(self) -> aiohttp.ClientSession:
+        # Normally opened in cog_load; recreated lazily if the cog is driven without it (or it was closed)
+        if self._http is None or self._http.closed:
+            self._http = self._make_http_session()
+        return self._http
 
     # ---------- Public entrypoints ----------
     @commands.command(name="logday")
-    async def logday_prefix(self, ctx: commands.Context):
-        """Prefix command: !logday (mirrors the slash command)"""
-        await self._start_flow(ctx.author, reply_channel=ctx.channel)
+    async def logday_prefix(self, ctx: commands.Context, *, block: Optional[str] = None):
+        """Prefix command: !logday (mirrors the slash command). Append a `key: value` block to log in one message."""
+        prefill, errors = parse_log_block(block) if block else ({}, [])
+        await self._start_flow(
+            ctx.author, reply_channel=ctx.channel, after_message_id=ctx.message.id,
+            prefill=prefill, prefill_errors=errors,
+        )
+
+    @commands.command(name="logtemplate")
+    async def logtemplate_prefix(self, ctx: commands.Context):
+        """Prefix command: !logtemplate — the block to fill in and paste (in DMs or after !logday)."""
+        await ctx.send(f"Copy, fill in, and paste this as one message:\n```\n{LOG_TEMPLATE}\n```")
 
     @app_commands.command(name="logday", description="Log today’s activity in a quick conversational DM flow.")
     async def logday_slash(self, interaction: discord.Interaction):
@@ -87,6 +820,230 @@ class ActivityCog(commands.Cog):
         )
         await self._start_flow(interaction.user, reply_channel=None)
 
+    @app_commands.command(name="logquick", description="Log today’s totals in one command; only missing details are asked in DMs.")
+    @app_commands.describe(
+        start_time="e.g. 9:00 AM",
+        end_time="e.g. 5:30 PM",
+        knocks_total="Total NOx (all knocks today)",
+        knocks_category="Primary knocks category",
+        presentations_no_sale="Presentations with no sale (total today)",
+        not_interested="Not interested count (total today)",
+        sales_count="Sales closed (total today)",
+        ap_amount="Total AP, e.g. 1243.50",
+        carrier="e.g. Aetna, Americo, MOO, Nassau",
+        dials_made="Dials made (total today)",
+        appts_booked_total="Appointments booked (total today)",
+        appts_booked_from_dials="Appointments booked from dials (subset of total)",
+        knocks_source_detail="Lead source/batch (LeadSource or Mixed days)",
+    )
+    @app_commands.choices(knocks_category=[
+        app_commands.Choice(name="CodeNOx", value="CODENOX"),
+        app_commands.Choice(name="LeadSource", value="LEADSOURCE"),
+        app_commands.Choice(name="ColdKnock", value="COLDKNOCK"),
+        app_commands.Choice(name="Mixed", value="MIXED"),
+    ])
+    async def logquick_slash(
+        self,
+        interaction: discord.Interaction,
+        start_time: str,
+        end_time: str,
+        knocks_total: app_commands.Range[int, 0],
+        knocks_category: app_commands.Choice[str],
+        presentations_no_sale: app_commands.Range[int, 0],
+        not_interested: app_commands.Range[int, 0],
+        sales_count: app_commands.Range[int, 0],
+        ap_amount: app_commands.Range[float, 0],
+        carrier: str,
+        dials_made: app_commands.Range[int, 0],
+        appts_booked_total: app_commands.Range[int, 0],
+        appts_booked_from_dials: app_commands.Range[int, 0],
+        knocks_source_detail: Optional[str] = None,
+        cold_knocks_total: Optional[app_commands.Range[int, 0]] = None,
+        cold_presentations_no_sale: Optional[app_commands.Range[int, 0]] = None,
+        cold_not_interested: Optional[app_commands.Range[int, 0]] = None,
+        cold_sales_count: Optional[app_commands.Range[int, 0]] = None,
+        cold_ap_amount: Optional[app_commands.Range[float, 0]] = None,
+        cold_appts_booked: Optional[app_commands.Range[int, 0]] = None,
+        lead_knocks_total: Optional[app_commands.Range[int, 0]] = None,
+        lead_presentations_no_sale: Optional[app_commands.Range[int, 0]] = None,
+        lead_not_interested: Optional[app_commands.Range[int, 0]] = None,
+        lead_sales_count: Optional[app_commands.Range[int, 0]] = None,
+        lead_ap_amount: Optional[app_commands.Range[float, 0]] = None,
+        lead_appts_booked: Optional[app_commands.Range[int, 0]] = None,
+    ):
+        # Options are keyed by DailyTotals field name, so the raw namespace goes through the shared validation.
+        # Cold / lead-source sections count as "no" unless one of their options is filled in.
+        prefill, errors = parse_log_pairs(dict(interaction.namespace).items(), sections_default_no=True)
+        await interaction.response.send_message("Got it — check your DMs for your saved log.", ephemeral=True)
+        await self._start_flow(interaction.user, reply_channel=None, prefill=prefill, prefill_errors=errors)
+
+    @app_commands.command(name="logpaste", description="Log today’s activity by filling in one form.")
+    async def logpaste_slash(self, interaction: discord.Interaction):
+        await interaction.response.send_modal(PasteLogModal(self))
+
+    @app_commands.command(name="stats", description="Activity totals for you (or another rep) over a date range.")
+    @app_commands.describe(user="Rep to look up (defaults to you)", period_range="Date range (defaults to today)")
+    @app_commands.rename(period_range="range")
+    @app_commands.choices(period_range=[app_commands.Choice(name=r.replace("_", " "), value=r) for r in STAT_RANGES])
+    async def stats_slash(
+        self,
+        interaction: discord.Interaction,
+        user: Optional[discord.User] = None,
+        period_range: Optional[app_commands.Choice[str]] = None,
+    ):
+        if not self.store:
+            await interaction.response.send_message("Stats aren’t enabled on this bot.", ephemeral=True)
+            return
+        target = user or interaction.user
+        range_name = period_range.value if period_range else "today"
+        period, start = resolve_range(range_name)
+        totals = await asyncio.to_thread(self.store.user_totals, str(target.id), period, start)
+        if not totals:
+            await interaction.response.send_message(f"No logs for {target.display_name} ({range_name.replace('_', ' ')}).")
+            return
+        await interaction.response.send_message(self._format_stats(target.display_name, range_name, totals))
+
+    @app_commands.command(name="leaderboard", description="Top reps by a metric over a date range.")
+    @app_commands.describe(metric="What to rank by (defaults to sales)", period_range="Date range (defaults to this week)")
+    @app_commands.rename(period_range="range")
+    @app_commands.choices(
+        metric=[app_commands.Choice(name=m.replace("_", " "), value=m) for m in ("logs", *ROLLUP_METRICS)][:25],
+        period_range=[app_commands.Choice(name=r.replace("_", " "), value=r) for r in STAT_RANGES],
+    )
+    async def leaderboard_slash(
+        self,
+        interaction: discord.Interaction,
+        metric: Optional[app_commands.Choice[str]] = None,
+        period_range: Optional[app_commands.Choice[str]] = None,
+    ):
+        if not self.store:
+            await interaction.response.send_message("Leaderboards aren’t enabled on this bot.", ephemeral=True)
+            return
+        metric_name = metric.value if metric else "sales"
+        range_name = period_range.value if period_range else "week"
+        period, start = resolve_range(range_name)
+        rows = await asyncio.to_thread(self.store.leaderboard, metric_name, period, start)
+        await interaction.response.send_message(self._format_leaderboard(metric_name, range_name, rows))
+
+    @app_commands.command(name="reminders", description="Get a DM reminder on work days you haven’t logged yet.")
+    @app_commands.describe(
+        action="Turn reminders on or off, or see your settings",
+        at="Your local time, e.g. `6:00 PM` or `18:00`",
+        timezone="Your timezone, e.g. `America/Chicago`",
+    )
+    @app_commands.rename(at="time")
+    @app_commands.choices(action=[app_commands.Choice(name=a, value=a) for a in ("on", "off", "status")])
+    async def reminders_slash(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        at: Optional[str] = None,
+        timezone: Optional[str] = None,
+    ):
+        if self.reminders is None:
+            await interaction.response.send_message("Reminders aren’t enabled on this bot.", ephemeral=True)
+            return
+        current = self.reminders.get(interaction.user.id)
+        if action.value == "off":
+            await self.reminders.remove(interaction.user.id)
+            await interaction.response.send_message("🔕 Reminders off.", ephemeral=True)
+            return
+        if action.value == "status":
+            if not current:
+                await interaction.response.send_message("Reminders are off. Turn them on with `/reminders on`.", ephemeral=True)
+                return
+            await interaction.response.send_message(self._format_reminder(interaction.user.id), ephemeral=True)
+            return
+
+        remind_at = parse_clock(at or (current.remind_at.strftime("%H:%M") if current else REMINDER_DEFAULT_TIME))
+        if remind_at is None:
+            await interaction.response.send_message("Couldn’t read that time — try `6:00 PM` or `18:00`.", ephemeral=True)
+            return
+        tz_name = (timezone or (current.tz if current else LOCAL_TIMEZONE)).strip()
+        try:
+            ZoneInfo(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            await interaction.response.send_message(f"Unknown timezone `{tz_name[:60]}` — try one like `America/Chicago`.", ephemeral=True)
+            return
+        # Check today's submitted logs, so a rep who logged before turning reminders on isn't reminded
+        logged = await self.dedupe.get(str(interaction.user.id), local_today().isoformat())
+        await self.reminders.enroll(interaction.user.id, tz_name, remind_at, already_logged=bool(logged and logged[0]))
+        await interaction.response.send_message("🔔 " + self._format_reminder(interaction.user.id), ephemeral=True)
+
+    @app_commands.command(name="import", description="Admin: back-load logs from a CSV in the bot’s CSV column layout.")
+    @app_commands.describe(file="CSV (or .csv.gz from /export) with a header row; same columns as the CSV fallback")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def import_slash(self, interaction: discord.Interaction, file: discord.Attachment):
+        name = file.filename.lower()
+        if not name.endswith((".csv", ".csv.gz")):
+            await interaction.response.send_message("Attach a `.csv` (or `.csv.gz`) file.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        stats = ImportStats()
+
+        async def report():
+            try:
+                await interaction.edit_original_response(content=self._format_import(file.filename, stats))
+            except discord.HTTPException:
+                pass    # interaction tokens expire after 15 minutes; the import carries on
+
+        error = None
+        try:
+            await self._import_csv(file.url, name.endswith(".gz"), stats, report)
+        except (aiohttp.ClientError, ValueError, zlib.error) as e:
+            error = str(e) or type(e).__name__
+        summary = self._format_import(file.filename, stats, done=True, error=error)
+        try:
+            await interaction.edit_original_response(content=summary)
+        except discord.HTTPException:
+            await self._send(interaction.user, summary)
+
+    @app_commands.command(name="export", description="Admin: download logged activity as compressed CSV.")
+    @app_commands.describe(period_range="Date range (defaults to all time)")
+    @app_commands.rename(period_range="range")
+    @app_commands.choices(period_range=[app_commands.Choice(name=r.replace("_", " "), value=r) for r in STAT_RANGES])
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def export_slash(self, interaction: discord.Interaction, period_range: Optional[app_commands.Choice[str]] = None):
+        if not self.store and not CSV_FALLBACK_PATH:
+            await interaction.response.send_message("Nothing to export: no activity store or CSV fallback on this bot.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        range_name = period_range.value if period_range else "all"
+        start, end = range_dates(range_name)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths, count = await asyncio.to_thread(self._write_export, tmp, f"activity-{range_name}", start, end)
+            if not count:
+                await interaction.followup.send(f"No logs for {range_name.replace('_', ' ')}.", ephemeral=True)
+                return
+            for n, path in enumerate(paths, start=1):
+                note = f"📦 {count} log{'s' if count != 1 else ''} ({range_name.replace('_', ' ')})"
+                if len(paths) > 1:
+                    note += f" — part {n}/{len(paths)}"
+                await interaction.followup.send(note, file=discord.File(path), ephemeral=True)
+
+    @import_slash.error
+    @export_slash.error
+    async def _admin_slash_error(self, interaction: discord.Interaction, error: Exception):
+        message = "You need the Administrator permission for this." if isinstance(error, app_commands.CheckFailure) else f"Error: {error}"
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, ephemeral=True)
+        except discord.HTTPException:
+            pass
+
+    @commands.command(name="metrics")
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def metrics_prefix(self, ctx: commands.Context):
+        """Admin: !metrics — where time is going (p50/p95/p99 at histogram-bucket resolution)."""
+        await ctx.send(self._format_metrics())
+
     # Register slash command to a single guild (fast) if GUILD_ID is set
     @logday_slash.error
     async def _slash_error(self, interaction: discord.Interaction, error: Exception):
@@ -95,24 +1052,101 @@ class ActivityCog(commands.Cog):
         except Exception:
             pass
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        # One dict lookup per message routes DM replies to their flow (guild traffic falls through)
+        if message.guild is None and not message.author.bot:
+            if self.router.dispatch(message):
+                return
+            # No live flow: after a restart, the rep's next DM re-attaches their checkpointed log
+            if message.author.id in self._saved_sessions:
+                self._saved_sessions.discard(message.author.id)
+                if (await self.bot.get_context(message)).valid:
+                    # A command (e.g. a fresh !logday) decides for itself what happens to the checkpoint
+                    self._saved_sessions.add(message.author.id)
+                    return
+                await self._resume_flow(message)
+
+    @tasks.loop(minutes=10)
+    async def _expire_sessions(self):
+        try:
+            await asyncio.to_thread(self.sessions.purge_expired)
+            self._saved_sessions = await asyncio.to_thread(self.sessions.user_ids)
+        except Exception as e:
+            print("[activities] Session expiry failed:", e)
+
+    @tasks.loop(seconds=15)
+    async def _evict_idle_flows(self):
+        # Only kicks in while reps are waiting; a paused flow keeps its checkpoint and resumes on the next reply
+        for entry in self.flows.evict_idle():
+            self.m_flows_evicted.inc()
+            dm = self.bot.get_partial_messageable(entry.conv.key[1])
+            try:
+                if self.sessions:
+                    await self._send(dm, "⏸️ Paused your log so other reps can get through — reply here anytime to pick up where you left off.")
+                else:
+                    await self._send(dm, "⏸️ Stopped your log after a while with no reply so other reps can get through. Start again with `/logday` or `!logday`.")
+            except Exception:
+                pass
+
+    @commands.command(name="synccommands")
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def synccommands_prefix(self, ctx: commands.Context):
+        """Admin: !synccommands — push slash commands to Discord even if the tree looks unchanged."""
+        try:
+            await self._sync_commands(force=True)
+        except Exception as e:
+            await ctx.send(f"Slash command sync failed: {e}")
+            return
+        await ctx.send(f"✅ Slash commands synced {'to this guild' if GUILD_ID else 'globally'}.")
+
     @commands.Cog.listener()
     async def on_ready(self):
-        # Try to sync the slash command if GUILD_ID is present
+        # on_ready also fires after gateway reconnects; only talk to Discord if the command tree changed
         try:
-            if GUILD_ID:
-                guild = discord.Object(id=int(GUILD_ID))
-                self.bot.tree.copy_global_to(guild=guild)
-                await self.bot.tree.sync(guild=guild)
-                print(f"[activities] Slash commands synced to guild {GUILD_ID}")
-            else:
-                # Try a global sync silently; may take longer to propagate first time
-                await self.bot.tree.sync()
-                print("[activities] Slash commands synced globally")
+            await self._sync_commands()
         except Exception as e:
             print("[activities] Slash command sync failed:", e)
 
+    async def _sync_commands(self, force: bool = False) -> bool:
+        """Sync slash commands to GUILD_ID (fast) or globally. Returns False when skipped as unchanged."""
+        guild = discord.Object(id=int(GUILD_ID)) if GUILD_ID else None
+        if guild:
+            self.bot.tree.copy_global_to(guild=guild)
+        target = f"guild:{GUILD_ID}" if guild else "global"
+        digest = self._tree_hash(guild)
+        hashes = await asyncio.to_thread(_load_tree_hashes) if TREE_HASH_PATH else {}
+        if not force and hashes.get(target) == digest:
+            print(f"[activities] Slash commands unchanged ({target}, {digest[:12]}); sync skipped")
+            return False
+
+        t0 = time.perf_counter()
+        # Global syncs may take a while to propagate the first time
+        await self.bot.tree.sync(guild=guild)
+        print(f"[activities] Slash commands synced ({target}) in {time.perf_counter() - t0:.2f}s")
+        if TREE_HASH_PATH:
+            hashes[target] = digest
+            try:
+                await asyncio.to_thread(_save_tree_hashes, hashes)
+            except OSError as e:
+                print("[activities] Could not save command tree hash:", e)
+        return True
+
+    def _tree_hash(self, guild: Optional[discord.abc.Snowflake]) -> str:
+        tree = self.bot.tree
+        payload = sorted((cmd.to_dict(tree) for cmd in tree.get_commands(guild=guild)), key=lambda d: (d["type"], d["name"]))
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
     # ---------- Flow logic ----------
-    async def _start_flow(self, user: discord.User | discord.Member, reply_channel: Optional[discord.abc.Messageable] = None):
+    async def _start_flow(
+        self,
+        user: discord.User | discord.Member,
+        reply_channel: Optional[discord.abc.Messageable] = None,
+        after_message_id: int = 0,
+        prefill: Optional[Dict[str, Any]] = None,
+        prefill_errors: Optional[list[str]] = None,
+    ):
         # Open DM
         try:
             dm = await user.create_dm()
@@ -121,241 +1155,378 @@ class ActivityCog(commands.Cog):
                 await reply_channel.send("I can’t DM you. Enable DMs from server members and try again.")
             return
 
-        await dm.send(
-            "**Daily Log — Moor Life Group / Summit Strength**\n"
-            "Answer a few quick questions. Type `cancel` anytime to stop.\n"
-        )
+        existing = self.flows.get(user.id)
+        if existing and not prefill:
+            # One flow per rep: point them back at the one they have instead of starting a second
+            await self._nudge_flow(dm, existing)
+            return
+        if existing:
+            # Pasted answers / slash options replace the flow in progress
+            await self.flows.replace(user.id)
+        # Starting over replaces any checkpointed, half-finished log
+        await self._forget_session(user.id)
+        await self._converse(dm, user.id, self._run_flow(dm, user, prefill=prefill, prefill_errors=prefill_errors),
+                             after_id=after_message_id, replace=bool(prefill))
 
-        # Identity + timing
-        start_time = await self._ask_text(dm, user, "Start time (e.g., `9:00 AM`): ")
-        if start_time is None: return
-        end_time = await self._ask_text(dm, user, "End time (e.g., `5:30 PM`): ")
-        if end_time is None: return
+    async def _resume_flow(self, message: discord.Message):
+        if self.flows.get(message.author.id):
+            return
+        saved = await asyncio.to_thread(self.sessions.load, message.author.id) if self.sessions else None
+        if saved is None:
+            return
+        _, values = saved
+        await self._converse(message.channel, message.author.id,
+                             self._continue_flow(message.channel, message.author, values, message), after_id=message.id)
 
-        # Totals first (whole day picture)
-        knocks_total = await self._ask_int(dm, user, "Total NOx (all knocks today): ")
-        if knocks_total is None: return
+    async def _nudge_flow(self, dm: discord.DMChannel, entry: FlowEntry):
+        if not entry.admitted:
+            await self._send(dm, f"⏳ You're already **#{self.flows.position(entry.user_id)}** in line — I'll start your log as soon as a slot frees up.")
+            return
+        prompt = entry.conv.prompt if entry.conv else None
+        await self._send(dm, "You already have a log in progress — just answer here, or type `cancel` to stop."
+                         + (f"\n{prompt}" if prompt else ""))
 
-        knocks_category = await self._ask_choice(
-            dm, user,
-            "Primary knocks category? Reply with `CodeNOx`, `LeadSource`, or `ColdKnock`. If you did both cold and lead today, reply `Mixed`.",
-            choices=["CODENOX", "LEADSOURCE", "COLDKNOCK", "MIXED"]
-        )
-        if knocks_category is None: return
+    async def _converse(self, dm: discord.DMChannel, user_id: int, flow: Awaitable[None], after_id: int = 0, replace: bool = False):
+        """Wait for a flow slot, run a flow coroutine against its routed conversation, then settle its checkpoint.
+
+        A flow the rep started meanwhile (e.g. a double-submitted form) is replaced with ``replace``;
+        otherwise the rep is pointed back at it and ``flow`` doesn't run.
+
+        Finished or cancelled flows drop their checkpoint. Timeouts, errors, idle eviction and shutdown
+        (task cancellation) keep it so the rep can pick up where they left off.
+        """
+        async def notify_queued(position: int):
+            await self._send(dm, f"⏳ Lots of reps are logging right now — you're **#{position}** in line. I'll start as soon as a slot frees up.")
+
+        try:
+            entry = await self.flows.admit(user_id, notify_queued, replace=replace)
+        except FlowBusy as busy:
+            flow.close()
+            await self._nudge_flow(dm, busy.entry)
+            return
+        except BaseException:
+            flow.close()
+            raise
+        if entry is None:
+            flow.close()
+            self.m_flow_queue_timeouts.inc()
+            # A resumed log's checkpoint is still on disk; let the next DM try again
+            if self.sessions and await asyncio.to_thread(self.sessions.load, user_id):
+                self._saved_sessions.add(user_id)
+            try:
+                await self._send(dm, "⌛ Still busy, sorry — please try again in a few minutes.")
+            except Exception:
+                pass
+            return
+
+        # Replies for this flow are routed here by on_message
+        conv = self.router.open(user_id, dm.id, after_id=after_id)
+        entry.conv = conv
+        finished = False
+        try:
+            await flow
+            finished = True
+        finally:
+            self.router.close(conv)
+            self.flows.release(entry)
+        if finished and not conv.timed_out:
+            await self._forget_session(user_id)
+
+    async def _checkpoint(self, user_id: int, channel_id: int, values: Dict[str, Any]):
+        if not self.sessions:
+            return
+        try:
+            await asyncio.to_thread(self.sessions.save, user_id, channel_id, values)
+            self._saved_sessions.add(user_id)
+        except Exception as e:
+            print("[activities] Checkpoint failed:", e)
 
-        knocks_source_detail = ""
-        if knocks_category in ("LEADSOURCE", "MIXED"):
-            knocks_source_detail = await self._ask_text(dm, user, "Lead source/batch? (e.g., `Gamechanger`, `Silver`, `Integrity Preferred`): ")
-            if knocks_source_detail is None: return
+    async def _forget_session(self, user_id: int):
+        if not self.sessions or user_id not in self._saved_sessions:
+            return
+        self._saved_sessions.discard(user_id)
+        try:
+            await asyncio.to_thread(self.sessions.delete, user_id)
+        except Exception as e:
+            print("[activities] Checkpoint delete failed:", e)
+
+    async def _run_flow(
+        self,
+        dm: discord.DMChannel,
+        user: discord.User | discord.Member,
+        prefill: Optional[Dict[str, Any]] = None,
+        prefill_errors: Optional[list[str]] = None,
+    ):
+        values: Dict[str, Any] = dict(prefill or {})
+        if values:
+            # Fast path: answers came from a pasted block / slash options; only ask what's missing or invalid
+            if prefill_errors:
+                await self._send(dm, "Some fields need another look: " + "; ".join(prefill_errors))
+            if next(self._pending_fields(values), None):
+                await self._send(dm, "**Daily Log** — just a few more questions. Type `cancel` anytime to stop.")
         else:
-            knocks_source_detail = ""
-
-        presentations_no_sale = await self._ask_int(dm, user, "Presentations with **no sale** (total today): ")
-        if presentations_no_sale is None: return
-
-        not_interested = await self._ask_int(dm, user, "`Not interested` count (total today): ")
-        if not_interested is None: return
-
-        sales_count = await self._ask_int(dm, user, "Sales closed (count, total today): ")
-        if sales_count is None: return
-
-        ap_amount = await self._ask_float(dm, user, "Total AP (e.g., `1243.50`): ")
-        if ap_amount is None: return
-
-        carrier = await self._ask_text(dm, user, "Carrier (e.g., `Aetna`, `Americo`, `MOO`, `Nassau`): ")
-        if carrier is None: return
-
-        dials_made = await self._ask_int(dm, user, "Dials made (total today): ")
-        if dials_made is None: return
-
-        appts_booked_total = await self._ask_int(dm, user, "Appointments booked (total today): ")
-        if appts_booked_total is None: return
-
-        appts_booked_from_dials = await self._ask_int(dm, user, "Appointments booked **from dials** (subset of total): ")
-        if appts_booked_from_dials is None: return
-
-        # Optional: Cold Knock breakdown
-        cold_knocks_total = cold_presentations_no_sale = cold_not_interested = cold_sales_count = cold_appts_booked = 0
-        cold_ap_amount = 0.0
-        had_cold = await self._ask_yes_no(dm, user, "Did you do **Cold Knocks** today? (`yes`/`no`): ")
-        if had_cold is None: return
-        if had_cold:
-            cold_knocks_total = await self._ask_int(dm, user, "Cold Knocks — total knocks: ")
-            if cold_knocks_total is None: return
-            cold_presentations_no_sale = await self._ask_int(dm, user, "Cold Knocks — presentations with no sale: ")
-            if cold_presentations_no_sale is None: return
-            cold_not_interested = await self._ask_int(dm, user, "Cold Knocks — not interested count: ")
-            if cold_not_interested is None: return
-            cold_sales_count = await self._ask_int(dm, user, "Cold Knocks — sales count: ")
-            if cold_sales_count is None: return
-            cold_ap_amount = await self._ask_float(dm, user, "Cold Knocks — AP amount (e.g., `500`): ")
-            if cold_ap_amount is None: return
-            cold_appts_booked = await self._ask_int(dm, user, "Cold Knocks — appointments booked: ")
-            if cold_appts_booked is None: return
-
-        # Optional: Lead-source breakdown
-        lead_knocks_total = lead_presentations_no_sale = lead_not_interested = lead_sales_count = lead_appts_booked = 0
-        lead_ap_amount = 0.0
-        had_leads = await self._ask_yes_no(dm, user, "Did you work **Lead-source knocks** today? (`yes`/`no`): ")
-        if had_leads is None: return
-        if had_leads:
-            lead_knocks_total = await self._ask_int(dm, user, "Lead-source — total knocks: ")
-            if lead_knocks_total is None: return
-            lead_presentations_no_sale = await self._ask_int(dm, user, "Lead-source — presentations with no sale: ")
-            if lead_presentations_no_sale is None: return
-            lead_not_interested = await self._ask_int(dm, user, "Lead-source — not interested count: ")
-            if lead_not_interested is None: return
-            lead_sales_count = await self._ask_int(dm, user, "Lead-source — sales count: ")
-            if lead_sales_count is None: return
-            lead_ap_amount = await self._ask_float(dm, user, "Lead-source — AP amount (e.g., `750`): ")
-            if lead_ap_amount is None: return
-            lead_appts_booked = await self._ask_int(dm, user, "Lead-source — appointments booked: ")
-            if lead_appts_booked is None: return
-
-        # Build payload
-        timestamp_utc = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
-        display_name = getattr(user, "display_name", None) or user.name
-
-        payload = DailyTotals(
-            timestamp_utc=timestamp_utc,
-            discord_user_id=str(user.id),
-            discord_display_name=display_name,
-            start_time=start_time,
-            end_time=end_time,
-            knocks_total=knocks_total,
-            knocks_category=knocks_category,              # already uppercased in _ask_choice
-            knocks_source_detail=knocks_source_detail,
-            presentations_no_sale=presentations_no_sale,
-            not_interested=not_interested,
-            sales_count=sales_count,
-            ap_amount=float(ap_amount),
-            carrier=carrier,
-            dials_made=dials_made,
-            appts_booked_total=appts_booked_total,
-            appts_booked_from_dials=appts_booked_from_dials,
-            cold_knocks_total=cold_knocks_total,
-            cold_presentations_no_sale=cold_presentations_no_sale,
-            cold_not_interested=cold_not_interested,
-            cold_sales_count=cold_sales_count,
-            cold_ap_amount=float(cold_ap_amount),
-            cold_appts_booked=cold_appts_booked,
-            lead_knocks_total=lead_knocks_total,
-            lead_presentations_no_sale=lead_presentations_no_sale,
-            lead_not_interested=lead_not_interested,
-            lead_sales_count=lead_sales_count,
-            lead_ap_amount=float(lead_ap_amount),
-            lead_appts_booked=lead_appts_booked,
-            idempotency_key=f"{user.id}-{timestamp_utc}",
-            auth_secret=WEBHOOK_AUTH_SECRET or "",
-        )
+            await self._send(
+                dm,
+                "**Daily Log — Moor Life Group / Summit Strength**\n"
+                "Answer a few quick questions. Type `cancel` anytime to stop.\n"
+                "_Tip: paste the whole log as `key: value` lines (see `!logtemplate`) to answer everything at once._\n"
+            )
+            # The first answer may be a pasted block instead of a start time
+            first = await self._ask_field(dm, user, FIELDS[0])
+            if first is None: return
+            pasted, errors = parse_log_block(first)
+            typed = sum(1 for line in first.splitlines() if ":" in line and field_named(line.partition(":")[0]))
+            if typed >= 2 or errors:
+                values = pasted
+                if errors:
+                    await self._send(dm, "Some fields need another look: " + "; ".join(errors))
+            else:
+                values[FIELDS[0].key] = first
 
-        # Send to Zapier webhook
-        ok, err = await self._post_webhook(asdict(payload)) if WEBHOOK_URL else (True, None)
+        values = await self._collect(dm, user, values)
+        if values is None: return
 
-        # Optional CSV fallback (only if a path is provided)
-        if CSV_FALLBACK_PATH:
+        await self._submit(dm, user, values)
+
+    async def _continue_flow(self, dm: discord.DMChannel, user: discord.User, values: Dict[str, Any], reply: discord.Message):
+        """Pick a checkpointed flow back up after ``reply`` woke it.
+
+        The question pending before the restart or timeout may have been asked hours ago, so
+        ``reply`` is never taken as its answer: the question is asked again instead.
+        """
+        if reply.content.strip().lower() == "cancel":
+            await self._send(dm, "❎ Cancelled.")
+            return
+        if next(self._pending_fields(values), None) is not None:
+            await self._send(dm, "↩️ Picking up your daily log where you left off.")
+
+        values = await self._collect(dm, user, values)
+        if values is None: return
+
+        await self._submit(dm, user, values)
+
+    async def _collect(self, dm: discord.DMChannel, user: discord.User, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Ask, in flow order, for every applicable field not already in ``values``.
+
+        Answers are checkpointed after each step so a restart mid-flow loses nothing.
+        """
+        await self._checkpoint(user.id, dm.id, values)
+        for field in self._pending_fields(values):
+            answer = await self._ask_field(dm, user, field)
+            if answer is None:
+                return None
+            values[field.key] = answer
+            await self._checkpoint(user.id, dm.id, values)
+        return values
+
+    def _pending_fields(self, values: Dict[str, Any]):
+        # Lazy, so conditions see answers collected earlier in the same pass
+        for field in FIELDS:
+            if field.key in values or (field.when and not field.when(values)):
+                continue
+            yield field
+
+    async def _ask_field(self, dm: discord.DMChannel, user: discord.User, field: Field) -> Optional[Any]:
+        conv = self.router.get(user.id, dm.id)
+        if conv:
+            conv.prompt = field.prompt      # re-sent if the rep runs /logday again mid-flow
+        t0 = time.perf_counter()
+        answer = await self._ask_field_kind(dm, user, field)
+        if answer is not None:
+            self.m_prompt.observe(time.perf_counter() - t0, kind=field.kind)
+        return answer
+
+    async def _ask_field_kind(self, dm: discord.DMChannel, user: discord.User, field: Field) -> Optional[Any]:
+        if field.kind == "int":
+            return await self._ask_int(dm, user, field.prompt)
+        if field.kind == "float":
+            return await self._ask_float(dm, user, field.prompt)
+        if field.kind == "choice":
+            return await self._ask_choice(dm, user, field.prompt, choices=list(field.choices))
+        if field.kind == "yesno":
+            return await self._ask_yes_no(dm, user, field.prompt)
+        return await self._ask_text(dm, user, field.prompt)
+
+    async def _display_name(self, user: discord.User | discord.Member) -> str:
+        """Server nickname for the rep. Flows started or resumed in DMs only have a User, and the
+        member cache may be off (LOW_MEMORY), so the member is fetched once and the name remembered."""
+        if isinstance(user, discord.Member):
+            self._remember_name(user.id, user.display_name)
+            return user.display_name
+        name = self._display_names.get(user.id)
+        if name:
+            self._display_names.move_to_end(user.id)
+            return name
+        guild = self.bot.get_guild(int(GUILD_ID)) if GUILD_ID else None
+        member = guild.get_member(user.id) if guild else None
+        if guild and member is None:
             try:
-                self._append_csv(payload)
-            except Exception as e:
-                # Non-fatal; user already posted
-                err = err or f"CSV fallback error: {e}"
-
-        # DM summary
-        if ok:
-            await dm.send(self._format_summary(payload))
-            # Optional: echo into a log channel for accountability
-            if LOG_CHANNEL_ID:
-                channel = self.bot.get_channel(LOG_CHANNEL_ID)
-                if channel:
-                    try:
-                        await channel.send(self._format_public_summary(payload))
-                    except Exception:
-                        pass
+                member = await guild.fetch_member(user.id)
+            except discord.HTTPException:
+                member = None
+        name = member.display_name if member else (getattr(user, "display_name", None) or user.name)
+        self._remember_name(user.id, name)
+        return name
+
+    def _remember_name(self, user_id: int, name: str):
+        self._display_names[user_id] = name
+        self._display_names.move_to_end(user_id)
+        if len(self._display_names) > DISPLAY_NAME_CACHE:
+            self._display_names.popitem(last=False)
+
+    def _build_payload(
+        self, user: discord.User | discord.Member, values: Dict[str, Any], display_name: Optional[str] = None,
+    ) -> DailyTotals:
+        timestamp_utc = dt.datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        display_name = display_name or getattr(user, "display_name", None) or user.name
+        return make_payload(str(user.id), display_name, timestamp_utc, values)
+
+    async def _submit(self, dm: discord.DMChannel, user: discord.User | discord.Member, values: Dict[str, Any]):
+        payload = self._build_payload(user, values, display_name=await self._display_name(user))
+        day = work_date(payload)
+        previous = await self.dedupe.get(payload.discord_user_id, day.isoformat())
+        if previous and previous[0] == payload.content_hash:
+            # Same numbers as the log already saved for today: nothing new to send anywhere
+            self.m_logs.inc(result="duplicate")
+            await self._mark_logged(user.id)
+            await self._send(dm, f"✅ Already logged — this matches your log for {day:%a %b} {day.day}. Nothing was sent again.")
+            return
+        if previous:
+            supersede(payload, previous[1])
+
+        # Fan out to every sink at once; the rep hears back as soon as the log is accepted
+        results = await self.pipeline.submit(payload)
+        failed = [r for r in results if not r.ok]
+        self.m_logs.inc(result="failed" if failed else "replaced" if payload.supersedes_key else "accepted")
+        if not failed:
+            self.dedupe.remember(payload.discord_user_id, day.isoformat(), payload.content_hash, payload.idempotency_key)
+            await self._mark_logged(user.id)
+            if payload.supersedes_key:
+                await self._send(dm, f"♻️ Replaces your earlier log for {day:%a %b} {day.day}.\n" + self._format_summary(payload))
+            else:
+                await self._send(dm, self._format_summary(payload))
         else:
-            await dm.send(f"❌ I couldn’t post your log to the webhook. Error: `{err}`")
+            await self._send(dm, f"❌ I couldn’t post your log to the webhook. Error: `{failed[0].error}`")
+
+    def _accepted_for_day(self, user_id: str, day: str) -> Optional[tuple[str, str]]:
+        """Dedupe fallback (blocking): the rep's current stored log for ``day``. A log the outbox gave up
+        on keeps its key, so a resubmission replaces it, but never counts as a duplicate of it."""
+        entry = self.store.latest_for_day(user_id, day)
+        if entry and self.outbox and self.outbox.outbox.is_dead(entry[1]):
+            return "", entry[1]
+        return entry
+
+    def _on_dead_letter(self, data: Dict[str, Any]):
+        try:
+            day = local_date(data["timestamp_utc"]).isoformat()
+        except (KeyError, ValueError):
+            return
+        self.dedupe.void(str(data.get("discord_user_id")), day, str(data.get("idempotency_key")))
+
+    async def _mark_logged(self, user_id: int):
+        if self.reminders is None:
+            return
+        try:
+            await self.reminders.mark_logged(user_id)
+        except Exception as e:
+            print("[activities] Could not record log for reminders:", e)
+
+    # ---------- Reminders ----------
+    async def _send_reminder(self, user_id: int):
+        user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+        # Clicks go to the persistent view added in cog_load; a stopped copy isn't tracked per message
+        view = ReminderView(self)
+        view.stop()
+        await self._send(user, "⏰ You haven’t logged today yet — tap below to log in one form, or go step by step.", view=view)
 
     # ---------- Helpers: ask/validate ----------
     async def _ask_text(self, dm: discord.DMChannel, user: discord.User, prompt: str) -> Optional[str]:
-        await dm.send(prompt)
+        await self._send(dm, prompt)
         resp = await self._wait_for(dm, user)
         if not resp: return None
         content = resp.content.strip()
         if content.lower() == "cancel":
-            await dm.send("❎ Cancelled.")
+            await self._send(dm, "❎ Cancelled.")
             return None
         return content
 
     async def _ask_int(self, dm: discord.DMChannel, user: discord.User, prompt: str) -> Optional[int]:
-        await dm.send(prompt)
+        await self._send(dm, prompt)
         while True:
             resp = await self._wait_for(dm, user)
             if not resp: return None
             content = resp.content.strip().lower()
             if content == "cancel":
-                await dm.send("❎ Cancelled.")
+                await self._send(dm, "❎ Cancelled.")
                 return None
-            try:
-                val = int(content.replace(",", ""))
-                if val < 0: raise ValueError
+            val = parse_int(content)
+            if val is not None:
                 return val
-            except ValueError:
-                await dm.send("Please reply with a non-negative whole number:")
+            await self._send(dm, "Please reply with a non-negative whole number:")
 
     async def _ask_float(self, dm: discord.DMChannel, user: discord.User, prompt: str) -> Optional[float]:
-        await dm.send(prompt)
+        await self._send(dm, prompt)
         while True:
             resp = await self._wait_for(dm, user)
             if not resp: return None
             content = resp.content.strip().lower()
             if content == "cancel":
-                await dm.send("❎ Cancelled.")
+                await self._send(dm, "❎ Cancelled.")
                 return None
-            try:
-                val = float(content.replace(",", ""))
-                if val < 0: raise ValueError
+            val = parse_float(content)
+            if val is not None:
                 return val
-            except ValueError:
-                await dm.send("Please reply with a non-negative number (e.g., `1250` or `1250.50`):")
+            await self._send(dm, "Please reply with a non-negative number (e.g., `1250` or `1250.50`):")
 
     async def _ask_choice(self, dm: discord.DMChannel, user: discord.User, prompt: str, choices: list[str]) -> Optional[str]:
-        await dm.send(prompt)
-        upper = [c.upper() for c in choices]
+        await self._send(dm, prompt)
         while True:
             resp = await self._wait_for(dm, user)
             if not resp: return None
             content = resp.content.strip().upper()
             if content == "CANCEL":
-                await dm.send("❎ Cancelled.")
+                await self._send(dm, "❎ Cancelled.")
                 return None
-            if content in upper:
-                return content
+            val = parse_choice(content, choices)
+            if val is not None:
+                return val
             pretty = " / ".join(choices)
-            await dm.send(f"Please reply with one of: `{pretty}`")
+            await self._send(dm, f"Please reply with one of: `{pretty}`")
 
     async def _ask_yes_no(self, dm: discord.DMChannel, user: discord.User, prompt: str) -> Optional[bool]:
-        await dm.send(prompt)
+        await self._send(dm, prompt)
         while True:
             resp = await self._wait_for(dm, user)
             if not resp: return None
             content = resp.content.strip().lower()
             if content == "cancel":
-                await dm.send("❎ Cancelled.")
+                await self._send(dm, "❎ Cancelled.")
                 return None
-            if content in ("y", "yes"): return True
-            if content in ("n", "no"): return False
-            await dm.send("Please reply `yes` or `no`:")
+            val = parse_yes_no(content)
+            if val is not None:
+                return val
+            await self._send(dm, "Please reply `yes` or `no`:")
 
     async def _wait_for(self, dm: discord.DMChannel, user: discord.User) -> Optional[discord.Message]:
-        def check(m: discord.Message):
-            return m.author.id == user.id and m.channel.id == dm.id
+        conv = self.router.get(user.id, dm.id)
+        if conv is None:
+            return None
+        t0 = time.perf_counter()
         try:
-            return await self.bot.wait_for("message", check=check, timeout=QUESTION_TIMEOUT)
+            return await conv.next_message(QUESTION_TIMEOUT)
         except Exception:
+            conv.timed_out = True
+            self.m_reply_timeouts.inc()
             try:
-                await dm.send("⏱️ Timed out. You can start again with `/logday` or `!logday` anytime.")
+                if self.sessions:
+                    await self._send(dm, "⏱️ Timed out. Reply here later to pick up where you left off, or start over with `/logday` or `!logday`.")
+                else:
+                    await self._send(dm, "⏱️ Timed out. You can start again with `/logday` or `!logday` anytime.")
             except Exception:
                 pass
             return None
+        finally:
+            self.m_reply_wait.observe(time.perf_counter() - t0)
 
     # ---------- Helpers: outputs ----------
     def _format_summary(self, p: DailyTotals) -> str:
@@ -376,7 +1547,7 @@ class ActivityCog(commands.Cog):
 
     def _format_public_summary(self, p: DailyTotals) -> str:
         return (
-            f"📊 **Daily Log — {p.discord_display_name}**\n"
+            f"📊 **Daily Log — {p.discord_display_name}**{' (updated)' if p.supersedes_key else ''}\n"
             f"🕘 {p.start_time} → {p.end_time}  •  NOx **{p.knocks_total}**  •  {p.knocks_category}"
             + (f" • {p.knocks_source_detail}" if p.knocks_source_detail else "")
             + "\n"
@@ -388,32 +1559,276 @@ class ActivityCog(commands.Cog):
             f"_UTC: {p.timestamp_utc}_"
         )
 
+    def _format_stats(self, name: str, range_name: str, t: Dict[str, Any]) -> str:
+        return (
+            f"📈 **{name} — {range_name.replace('_', ' ')}** ({int(t['logs'])} log{'s' if t['logs'] != 1 else ''})\n"
+            f"NOx **{int(t['knocks'])}**  •  PresNS {int(t['presentations_no_sale'])}  •  NI {int(t['not_interested'])}\n"
+            f"🎯 Sales **{int(t['sales'])}**  •  AP **${t['ap']:,.2f}**\n"
+            f"📞 Dials **{int(t['dials'])}**  •  Appts **{int(t['appts'])}** (from dials {int(t['appts_from_dials'])})\n"
+            f"❄️ Cold: K {int(t['cold_knocks'])} / Sales {int(t['cold_sales'])} / AP ${t['cold_ap']:,.2f} / Appts {int(t['cold_appts'])}\n"
+            f"📇 Lead: K {int(t['lead_knocks'])} / Sales {int(t['lead_sales'])} / AP ${t['lead_ap']:,.2f} / Appts {int(t['lead_appts'])}"
+        )
+
+    def _format_leaderboard(self, metric: str, range_name: str, rows: list[tuple[str, str, float]]) -> str:
+        title = f"🏆 **Leaderboard — {metric.replace('_', ' ')}, {range_name.replace('_', ' ')}**"
+        if not rows:
+            return title + "\nNo logs yet."
+        lines = [title]
+        for rank, (_, name, value) in enumerate(rows, start=1):
+            shown = f"${value:,.2f}" if metric.endswith("ap") else f"{int(value)}"
+            lines.append(f"{rank}. {name} — **{shown}**")
+        return "\n".join(lines)
+
+    def _format_reminder(self, user_id: int) -> str:
+        r = self.reminders.get(user_id)
+        text = f"Reminders on at **{r.remind_at.strftime('%I:%M %p').lstrip('0')}** ({r.tz}) on days you haven’t logged."
+        due = self.reminders.next_due(user_id)
+        return text + (f" Next: <t:{int(due)}:F>." if due else "")
+
+    def _format_import(self, filename: str, s: ImportStats, done: bool = False, error: Optional[str] = None) -> str:
+        if error:
+            head = f"❌ Import of `{filename}` stopped: {error}"
+        else:
+            head = f"{'✅ Imported' if done else '⏳ Importing'} `{filename}`"
+        text = (
+            f"{head}\n"
+            f"Rows **{s.read}**  •  sent **{s.sent}**  •  duplicates {s.duplicates}  •  invalid {s.invalid}  •  failed {s.failed}"
+        )
+        if done and s.errors:
+            text += "\n```\n" + "\n".join(s.errors) + "\n```"
+        return text[:1990]
+
+    def _format_metrics(self) -> str:
+        def ms(v: float) -> str:
+            return "inf" if v == float("inf") else f"{v * 1000:.0f}"
+
+        lines = [f"active flows {len(self.router)}  queued {self.flows.waiting}"]
+        for hist in (self.m_prompt, self.m_reply_wait, self.m_webhook, self.m_sink, self.m_send, self.m_csv, self.m_loop_lag):
+            for key, (counts, _) in hist.series.items():
+                labels = dict(key)
+                tag = ",".join(f"{k}={v}" for k, v in key)
+                name = hist.name.removeprefix("activity_").removesuffix("_seconds") + (f"[{tag}]" if tag else "")
+                q = [ms(hist.quantile(p, **labels)) for p in (0.5, 0.95, 0.99)]
+                lines.append(f"{name:<28} n={sum(counts):<6} p50={q[0]}ms p95={q[1]}ms p99={q[2]}ms")
+        for counter in (self.m_logs, self.m_reply_timeouts, self.m_webhook_status, self.m_sink_failures,
+                        self.m_send_errors, self.m_rate_limits, self.m_flow_queue_timeouts, self.m_flows_evicted,
+                        self.m_reminders):
+            for key, value in counter.values.items():
+                tag = ",".join(f"{k}={v}" for k, v in key)
+                lines.append(f"{counter.name.removeprefix('activity_')}{'[' + tag + ']' if tag else ''} {value:g}")
+        body = "\n".join(lines)
+        if len(body) > 1900:
+            body = body[:1900] + "\n…"
+        return f"```\n{body}\n```"
+
+    # ---------- Import / export ----------
+    async def _import_csv(self, url: str, gzipped: bool, stats: ImportStats, report: Callable[[], Awaitable[None]]):
+        """Stream a CSV attachment row by row into the webhook (and local store), IMPORT_CONCURRENCY
+        deliveries at a time. The bounded queue paces the download to delivery, so memory stays flat."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=IMPORT_CONCURRENCY * 4)
+
+        async def deliver():
+            while (item := await queue.get()) is not None:
+                line, payload = item
+                day = work_date(payload)
+                ok, err = await self._deliver(payload)
+                if not ok:
+                    stats.failed += 1
+                    stats.error(line, err or "delivery failed")
+                    self.dedupe.forget(payload.discord_user_id, day.isoformat())
+                    continue
+                stats.sent += 1
+                self.m_logs.inc(result="imported")
+                if self.store:
+                    try:
+                        await asyncio.to_thread(self.store.insert, stored_log(payload), day)
+                    except Exception as e:
+                        print("[activities] Import store write failed:", e)
+
+        workers = [asyncio.create_task(deliver(), name=f"import-{n}") for n in range(max(1, IMPORT_CONCURRENCY))]
+        last_report = time.monotonic()
+        try:
+            timeout = aiohttp.ClientTimeout(total=None, sock_read=60)
+            async with self.http.get(url, timeout=timeout) as resp:
+                resp.raise_for_status()
+                header: Optional[list[str]] = None
+                async for line, row in iter_csv_records(iter_lines(resp.content.iter_chunked(64 * 1024), gzipped)):
+                    if header is None:
+                        header = [name.strip() for name in row]
+                        missing = [c for c in ("discord_user_id", "timestamp_utc", *IMPORT_REQUIRED) if c not in header]
+                        if missing:
+                            raise ValueError("missing columns: " + ", ".join(missing))
+                        continue
+                    stats.read += 1
+                    payload, err = parse_import_row(dict(zip(header, row)))
+                    if payload is None:
+                        stats.invalid += 1
+                        stats.error(line, err)
+                        continue
+                    day = work_date(payload).isoformat()
+                    previous = await self.dedupe.get(payload.discord_user_id, day)
+                    if previous and previous[0] == payload.content_hash:
+                        stats.duplicates += 1
+                        continue
+                    if previous:
+                        supersede(payload, previous[1])
+                    # Claimed now so later rows for the same rep and day see it; undone if delivery fails
+                    self.dedupe.remember(payload.discord_user_id, day, payload.content_hash, payload.idempotency_key)
+                    await queue.put((line, payload))
+                    if time.monotonic() - last_report >= IMPORT_PROGRESS_SECONDS:
+                        last_report = time.monotonic()
+                        await report()
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+    def _write_export(self, directory: str, stem: str, start: Optional[str], end: Optional[str]) -> tuple[list[str], int]:
+        """Blocking: stream logs from the store (or the raw CSV fallback) into gzip parts."""
+        if self.store:
+            rows: Iterable[Dict[str, Any]] = self.store.iter_logs(start, end)
+        else:
+            def in_range(row: Dict[str, str]) -> bool:
+                try:
+                    day = local_date(row.get("timestamp_utc") or "").isoformat()
+                except ValueError:
+                    return False
+                return (not start or day >= start) and (not end or day < end)
+
+            rows = filter(in_range, read_csv_logs(CSV_FALLBACK_PATH))
+        parts = GzipCsvParts(directory, stem, EXPORT_HEADER, EXPORT_PART_BYTES)
+        count = 0
+        try:
+            for data in rows:
+                parts.write([data.get(name, "") for name in EXPORT_HEADER])
+                count += 1
+        finally:
+            paths = parts.close()
+        return paths, count
+
+    # ---------- Sinks ----------
+    def _build_pipeline(self) -> SinkPipeline:
+        sinks: list[Sink] = []
+        if WEBHOOK_URL:
+            # Required: with the outbox this is a local durable write; without it, the POST itself
+            sinks.append(Sink("webhook", self._sink_webhook, timeout=WEBHOOK_TIMEOUT + WEBHOOK_CONNECT_TIMEOUT, required=True))
+        if self.store:
+            # /stats, /leaderboard and dedupe read the store, so it only gets logs the rep was told were saved
+            sinks.append(Sink("store", self._sink_store, timeout=SINK_TIMEOUT, after_accept=True))
+        if CSV_FALLBACK_PATH:
+            sinks.append(Sink("csv", self._sink_csv, timeout=SINK_TIMEOUT))
+        if LOG_CHANNEL_ID:
+            # Optional: echo into a log channel for accountability (only for accepted logs)
+            sinks.append(Sink("log_channel", self._sink_log_channel, timeout=SINK_TIMEOUT, after_accept=True))
+        return SinkPipeline(sinks, on_result=self._observe_sink)
+
+    @property
+    def pipeline(self) -> SinkPipeline:
+        if self._pipeline is None:
+            self._pipeline = self._build_pipeline()
+        return self._pipeline
+
+    async def _sink_webhook(self, payload: DailyTotals):
+        ok, err = await self._deliver(payload)
+        if not ok:
+            raise RuntimeError(err)
+
+    async def _sink_store(self, payload: DailyTotals):
+        # Local history for /stats and /leaderboard
+        await asyncio.to_thread(self.store.insert, stored_log(payload), work_date(payload))
+
+    async def _sink_csv(self, payload: DailyTotals):
+        self._append_csv(payload)
+
+    async def _sink_log_channel(self, payload: DailyTotals):
+        if self.digest:
+            self.digest.add(payload)
+            return
+        await self._send_log_channel(self._format_public_summary(payload))
+
+    async def _send_log_channel(self, text: str):
+        channel = self.bot.get_channel(LOG_CHANNEL_ID)
+        if channel:
+            await self._send(channel, text)
+
     # ---------- Helpers: webhook & CSV ----------
+    async def _deliver(self, payload: DailyTotals) -> tuple[bool, Optional[str]]:
+        if not WEBHOOK_URL:
+            return True, None
+        data = asdict(payload)
+        if self.outbox:
+            try:
+                if not await self.outbox.enqueue(payload.idempotency_key, data):
+                    # Keys cover the rep, day, numbers and revision, so this exact log is already on its way
+                    print(f"[activities] {payload.idempotency_key} is already queued; not queued again")
+                return True, None
+            except Exception as e:
+                # Disk trouble: fall back to posting inline rather than losing the log
+                print("[activities] Outbox write failed, posting inline:", e)
+        return await self._post_webhook(data)
+
     async def _post_webhook(self, data: Dict[str, Any]) -> tuple[bool, Optional[str]]:
+        t0 = time.perf_counter()
+        try:
+            async with self.http.post(WEBHOOK_URL, json=data) as resp:
+                self.m_webhook_status.inc(code=str(resp.status))
+                if 200 <= resp.status < 300:
+                    # Drain the body so the connection goes back to the pool
+                    await resp.read()
+                    return True, None
+                text = await resp.text()
+                return False, f"HTTP {resp.status}: {text[:300]}"
+        except Exception as e:
+            self.m_webhook_status.inc(code="error")
+            return False, str(e) or type(e).__name__
+        finally:
+            self.m_webhook.observe(time.perf_counter() - t0, mode="single")
+
+    async def _post_webhook_batch(self, items: list[Dict[str, Any]]) -> Dict[str, str]:
+        """POST records as one JSON array. Returns {idempotency_key: error} for records to retry.
+
+        A non-2xx response fails the whole batch. A 2xx response may report partial failure with
+        ``{"failed": ["<key>", ...]}`` or ``{"results": [{"idempotency_key": "<key>", "ok": false, "error": "..."}]}``;
+        anything else counts as every record accepted.
+        """
+        keys = [str(item.get("idempotency_key", "")) for item in items]
+        t0 = time.perf_counter()
         try:
-            async with aiohttp.ClientSession(raise_for_status=False) as session:
-                async with session.post(
-                    WEBHOOK_URL,
-                    json=data,
-                    headers={"Content-Type": "application/json"},
-                    timeout=10
-                ) as resp:
-                    if 200 <= resp.status < 300:
-                        return True, None
-                    text = await resp.text()
-                    return False, f"HTTP {resp.status}: {text[:300]}"
+            async with self.http.post(WEBHOOK_URL, json=items) as resp:
+                self.m_webhook_status.inc(code=str(resp.status))
+                text = await resp.text()
+                if not 200 <= resp.status < 300:
+                    err = f"HTTP {resp.status}: {text[:300]}"
+                    return {k: err for k in keys}
         except Exception as e:
-            return False, str(e)
+            self.m_webhook_status.inc(code="error")
+            err = str(e) or type(e).__name__
+            return {k: err for k in keys}
+        finally:
+            self.m_webhook.observe(time.perf_counter() - t0, mode="batch")
+
+        try:
+            body = json.loads(text) if text else None
+        except ValueError:
+            return {}
+        if not isinstance(body, dict):
+            return {}
+        failed: Dict[str, str] = {}
+        for key in body.get("failed") or []:
+            failed[str(key)] = "rejected by receiver"
+        for result in body.get("results") or []:
+            if isinstance(result, dict) and result.get("ok") is False:
+                failed[str(result.get("idempotency_key"))] = str(result.get("error") or "rejected by receiver")
+        return failed
 
     def _append_csv(self, payload: DailyTotals):
+        """Queue a row for the background CSV writer (never touches disk on the event loop)."""
         if not CSV_FALLBACK_PATH:
             return
-        write_headers = not os.path.exists(CSV_FALLBACK_PATH)
-        with open(CSV_FALLBACK_PATH, "a", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            if write_headers:
-                w.writerow(list(asdict(payload).keys()))
-            w.writerow(list(asdict(payload).values()))
+        with self.m_csv.time():
+            if self.csv_sink is None:
+                self.csv_sink = self._make_csv_sink()
+            self.csv_sink.write(csv_row(payload))
 
 
 async def setup(bot: commands.Bot):
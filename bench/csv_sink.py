@@ -0,0 +1,90 @@
+"""Benchmark: event-loop stall from the CSV fallback under concurrent submissions.
+
+Fires N concurrent submissions that each append one DailyTotals row, while a
+ticker task measures how late the loop wakes it. Compares the original
+synchronous append (exists check + open/close + two asdict calls per row)
+with the cog's buffered CsvSink.
+
+    python bench/csv_sink.py --submissions 500
+"""
+import argparse
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import activities  # noqa: E402
+
+
+def _sample_payload(i: int) -> activities.DailyTotals:
+    return activities.DailyTotals(
+        timestamp_utc="2026-10-17T22:00:00Z", discord_user_id=str(i), discord_display_name=f"Rep {i}",
+        start_time="9:00 AM", end_time="5:30 PM", knocks_total=40, knocks_category="MIXED",
+        knocks_source_detail="Silver", presentations_no_sale=3, not_interested=12, sales_count=2,
+        ap_amount=1243.5, carrier="Aetna", dials_made=30, appts_booked_total=4, appts_booked_from_dials=2,
+        idempotency_key=f"{i}-bench",
+    )
+
+
+def _old_append_csv(path: str, payload: activities.DailyTotals):
+    write_headers = not os.path.exists(path)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if write_headers:
+            w.writerow(list(asdict(payload).keys()))
+        w.writerow(list(asdict(payload).values()))
+
+
+async def _measure(append, submissions: int) -> dict:
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - t0 - 0.001)
+
+    async def submit(i: int):
+        await asyncio.sleep(0)
+        append(_sample_payload(i))
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(submit(i) for i in range(submissions)))
+    elapsed = time.perf_counter() - t0
+    await asyncio.sleep(0.01)
+    done.set()
+    await tick
+    return {"max_stall_ms": max(lags) * 1000, "loop_busy_ms": elapsed * 1000}
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--submissions", type=int, default=500)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.csv")
+        old = await _measure(lambda p: _old_append_csv(old_path, p), args.submissions)
+
+        activities.CSV_FALLBACK_PATH = os.path.join(tmp, "new.csv")
+        cog = activities.ActivityCog(bot=None)
+        new = await _measure(cog._append_csv, args.submissions)
+        await asyncio.to_thread(cog.csv_sink.close)
+        with open(activities.CSV_FALLBACK_PATH, encoding="utf-8") as f:
+            rows = sum(1 for _ in f) - 1
+
+    print(f"{'sink':<10} {'max stall ms':>13} {'loop busy ms':>13}")
+    print(f"{'sync':<10} {old['max_stall_ms']:>13.2f} {old['loop_busy_ms']:>13.2f}")
+    print(f"{'buffered':<10} {new['max_stall_ms']:>13.2f} {new['loop_busy_ms']:>13.2f}")
+    print(f"buffered sink wrote {rows} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
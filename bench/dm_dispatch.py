@@ -0,0 +1,118 @@
+"""Benchmark: per-message dispatch cost with K concurrent flows.
+
+Compares the old pattern (one ``bot.wait_for("message", check=...)`` per
+pending question, so every message runs K predicates) with the cog's
+ConversationRouter (one dict lookup in ``on_message``). Runs entirely
+offline against an unconnected ``commands.Bot``.
+
+    python bench/dm_dispatch.py --messages 20000 --answer-ratio 0.1
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import discord
+from discord.ext import commands
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import activities  # noqa: E402
+
+_ids = itertools.count(1)
+
+
+class _BenchBot(commands.Bot):
+    async def on_message(self, message):
+        # Skip command parsing; both modes would pay it equally
+        pass
+
+
+def _message(author_id: int, channel_id: int, guild) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=next(_ids),
+        author=SimpleNamespace(id=author_id, bot=False),
+        channel=SimpleNamespace(id=channel_id),
+        guild=guild,
+        content="1",
+    )
+
+
+def _traffic(flows: int, messages: int, answer_ratio: float):
+    guild = SimpleNamespace(id=1)
+    every = max(1, round(1 / answer_ratio)) if answer_ratio else 0
+    for i in range(messages):
+        if every and i % every == 0:
+            k = (i // every) % flows
+            yield _message(10_000 + k, 20_000 + k, None)     # a rep answering in their DM
+        else:
+            yield _message(99, 42, guild)                     # unrelated guild chatter
+
+
+async def _drive(bot: commands.Bot, flows: int, messages: int, answer_ratio: float) -> float:
+    t0 = time.perf_counter()
+    for n, msg in enumerate(_traffic(flows, messages, answer_ratio)):
+        bot.dispatch("message", msg)
+        if n % 100 == 0:
+            await asyncio.sleep(0)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    return (time.perf_counter() - t0) / messages * 1e6
+
+
+async def bench_wait_for(flows: int, messages: int, answer_ratio: float) -> float:
+    async def flow(uid: int, cid: int):
+        while True:
+            await bot.wait_for("message", check=lambda m: m.author.id == uid and m.channel.id == cid)
+
+    async with _BenchBot(command_prefix="!", intents=discord.Intents.none()) as bot:
+        tasks = [asyncio.create_task(flow(10_000 + k, 20_000 + k)) for k in range(flows)]
+        await asyncio.sleep(0)
+        try:
+            return await _drive(bot, flows, messages, answer_ratio)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def bench_router(flows: int, messages: int, answer_ratio: float) -> float:
+    async def flow(uid: int, cid: int):
+        conv = cog.router.open(uid, cid)
+        while True:
+            await conv.next_message(None)
+
+    async with _BenchBot(command_prefix="!", intents=discord.Intents.none()) as bot:
+        cog = activities.ActivityCog(bot)
+        await bot.add_cog(cog)
+        tasks = [asyncio.create_task(flow(10_000 + k, 20_000 + k)) for k in range(flows)]
+        await asyncio.sleep(0)
+        try:
+            return await _drive(bot, flows, messages, answer_ratio)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await bot.remove_cog(cog.qualified_name)
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--messages", type=int, default=20000)
+    ap.add_argument("--answer-ratio", type=float, default=0.1, help="share of messages that are DM answers")
+    ap.add_argument("--flows", type=int, nargs="*", default=[10, 100, 1000])
+    args = ap.parse_args()
+    # Only message routing is measured: keep the cog's on-disk stores out of the working directory
+    activities.SESSION_STORE_PATH = activities.ACTIVITY_DB_PATH = activities.REMINDER_DB_PATH = ""
+
+    print(f"{'flows':>6} {'wait_for us/msg':>16} {'router us/msg':>14}")
+    for k in args.flows:
+        old = await bench_wait_for(k, args.messages, args.answer_ratio)
+        new = await bench_router(k, args.messages, args.answer_ratio)
+        print(f"{k:>6} {old:>16.1f} {new:>14.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
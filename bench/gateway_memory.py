@@ -0,0 +1,149 @@
+"""Benchmark: memory and startup cost of the gateway profiles on a simulated large guild.
+
+Builds the bot exactly as main.py does (``gateway_options``) for the default and
+the LOW_MEMORY profile, then feeds discord.py's connection state what a large
+guild sends on startup: GUILD_CREATE, the member chunks the default profile
+requests (members intent + chunking at startup), and a stream of channel
+messages for the message cache. Each profile runs in a fresh process. Reports
+RSS growth, time until the guild is fully cached and how many objects the
+caches hold. Network time is not simulated unless ``--chunk-ms`` is set.
+
+    python bench/gateway_memory.py --members 100000 --messages 5000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+from discord.ext import commands
+from discord.state import ChunkRequest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from main import gateway_options  # noqa: E402
+
+GUILD_ID = 900_000_000_000_000_000
+BOT_ID = 800_000_000_000_000_000
+CHANNELS = 200
+ROLES = 50
+CHUNK_SIZE = 1000   # Discord's GUILD_MEMBERS_CHUNK size
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _user(uid: int) -> dict:
+    return {"id": str(uid), "username": f"rep{uid % 1_000_000}", "discriminator": "0",
+            "global_name": f"Rep {uid % 1_000_000}", "avatar": None}
+
+
+def _member(uid: int) -> dict:
+    return {"user": _user(uid), "nick": None, "roles": [str(GUILD_ID + 1 + uid % ROLES)],
+            "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+
+def guild_create(members: int) -> dict:
+    return {
+        "id": str(GUILD_ID), "name": "Large Guild", "owner_id": str(BOT_ID + 1), "member_count": members,
+        "large": True, "features": [], "emojis": [], "stickers": [], "threads": [], "presences": [],
+        "voice_states": [], "members": [_member(BOT_ID)],
+        "roles": [{"id": str(GUILD_ID + i), "name": f"role{i}", "permissions": "0", "position": i,
+                   "color": 0, "hoist": False, "managed": False, "mentionable": False} for i in range(ROLES + 1)],
+        "channels": [{"id": str(GUILD_ID + 10_000 + i), "type": 0, "name": f"channel-{i}", "position": i,
+                      "permission_overwrites": [], "guild_id": str(GUILD_ID)} for i in range(CHANNELS)],
+    }
+
+
+def message(n: int, members: int) -> dict:
+    uid = BOT_ID + 10 + n % members
+    return {
+        "id": str(GUILD_ID + 1_000_000 + n), "channel_id": str(GUILD_ID + 10_000 + n % CHANNELS),
+        "guild_id": str(GUILD_ID), "author": _user(uid), "member": {k: v for k, v in _member(uid).items() if k != "user"},
+        "content": "knocked 40 doors today, 2 sales " * 3, "timestamp": "2026-10-17T18:00:00+00:00",
+        "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+        "attachments": [], "embeds": [], "pinned": False, "type": 0,
+    }
+
+
+async def run_profile(low_memory: bool, members: int, messages: int, max_messages: int, chunk_ms: float) -> dict:
+    options = gateway_options(low_memory, max_messages)
+    bot = commands.Bot(command_prefix="!", **options)
+    state = bot._connection
+    state.dispatch = lambda *args, **kwargs: None   # no event handlers; measure the caches only
+    gc.collect()
+    base = rss_mb()
+
+    t0 = time.perf_counter()
+    state.parse_guild_create(guild_create(members))
+    guild = bot.get_guild(GUILD_ID)
+    chunks = 0
+    if state._chunk_guilds and options["intents"].members:
+        # What chunking at startup pulls down before the guild counts as ready
+        request = ChunkRequest(GUILD_ID, 0, asyncio.get_running_loop(), state._get_guild, cache=state.member_cache_flags.joined)
+        state._chunk_requests[request.nonce] = request
+        total = -(-members // CHUNK_SIZE)
+        for i in range(total):
+            ids = range(BOT_ID + 10 + i * CHUNK_SIZE, BOT_ID + 10 + min(members, (i + 1) * CHUNK_SIZE))
+            state.parse_guild_members_chunk({
+                "guild_id": str(GUILD_ID), "members": [_member(uid) for uid in ids],
+                "chunk_index": i, "chunk_count": total, "nonce": request.nonce,
+            })
+            chunks += 1
+            if chunk_ms:
+                await asyncio.sleep(chunk_ms / 1000)
+    ready_s = time.perf_counter() - t0
+
+    for n in range(messages):
+        state.parse_message_create(message(n, members))
+    gc.collect()
+    return {
+        "profile": "low-memory" if low_memory else "default",
+        "intents": options["intents"].value,
+        "ready_s": ready_s,
+        "chunks": chunks,
+        "cached_members": len(guild.members),
+        "cached_messages": len(state._messages) if state._messages is not None else 0,
+        "rss_mb": rss_mb() - base,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--members", type=int, default=100_000)
+    ap.add_argument("--messages", type=int, default=5000, help="channel messages seen after startup")
+    ap.add_argument("--chunk-ms", type=float, default=0.0, help="simulated gateway latency per member chunk")
+    ap.add_argument("--profile", choices=("default", "low"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.profile:
+        low = args.profile == "low"
+        result = asyncio.run(run_profile(low, args.members, args.messages, 0 if low else 1000, args.chunk_ms))
+        print(json.dumps(result))
+        return
+
+    rows = []
+    for profile in ("default", "low"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--profile", profile, "--members", str(args.members),
+             "--messages", str(args.messages), "--chunk-ms", str(args.chunk_ms)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"{args.members} members, {CHANNELS} channels, {args.messages} messages, chunk latency {args.chunk_ms:g} ms")
+    print(f"{'profile':<12} {'RSS +MB':>9} {'ready s':>9} {'chunks':>7} {'members':>9} {'messages':>9}")
+    for r in rows:
+        print(f"{r['profile']:<12} {r['rss_mb']:>9.1f} {r['ready_s']:>9.3f} {r['chunks']:>7} "
+              f"{r['cached_members']:>9} {r['cached_messages']:>9}")
+
+
+if __name__ == "__main__":
+    main()
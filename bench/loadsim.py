@@ -0,0 +1,263 @@
+"""Offline load simulation: N reps logging at once against a fake Discord and a stub webhook.
+
+Drives the real ``ActivityCog`` (``_start_flow`` -> prompts -> ``on_message``
+routing -> sink pipeline -> outbox) with stand-in DM channels that answer each
+prompt from a script after a configurable human "think time". The webhook is
+a local aiohttp stub. Reports flows/sec, per-prompt and end-to-end latency
+percentiles, event-loop lag, peak RSS and webhook posts/sec, and writes them
+as JSON so runs can be compared between releases.
+
+    python bench/loadsim.py --flows 500 --think-ms 300 --out bench/results/loadsim.json
+    python bench/loadsim.py --flows 500 --compare bench/results/loadsim.json
+"""
+import argparse
+import asyncio
+import datetime as dt
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import discord
+from aiohttp import web
+from discord.ext import commands
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import activities  # noqa: E402
+
+ANSWERS = {
+    "start_time": "9:00 AM", "end_time": "5:30 PM", "knocks_total": "42", "knocks_category": "Mixed",
+    "knocks_source_detail": "Silver", "presentations_no_sale": "3", "not_interested": "12", "sales_count": "2",
+    "ap_amount": "1243.50", "carrier": "Aetna", "dials_made": "30", "appts_booked_total": "4",
+    "appts_booked_from_dials": "2", "had_cold": "yes", "cold_knocks_total": "20", "cold_presentations_no_sale": "1",
+    "cold_not_interested": "6", "cold_sales_count": "1", "cold_ap_amount": "500", "cold_appts_booked": "2",
+    "had_leads": "yes", "lead_knocks_total": "22", "lead_presentations_no_sale": "2", "lead_not_interested": "6",
+    "lead_sales_count": "1", "lead_ap_amount": "743.50", "lead_appts_booked": "2",
+}
+PROMPT_ANSWERS = {f.prompt: ANSWERS[f.key] for f in activities.FIELDS}
+PASTE_BLOCK = "\n".join(f"{k}: {v}" for k, v in ANSWERS.items())
+
+_message_ids = itertools.count(1_000_000)
+
+
+def pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def summarize(values: list[float]) -> dict:
+    return {"p50": pct(values, 50), "p95": pct(values, 95), "p99": pct(values, 99), "max": max(values, default=0.0)}
+
+
+class SimRep:
+    """A rep plus their DM channel: answers each prompt after a think delay."""
+
+    def __init__(self, sim: "Simulation", n: int):
+        self.sim = sim
+        self.id = 10_000 + n
+        self.name = f"rep{n}"
+        self.display_name = f"Rep {n}"
+        self.bot = False
+        self.dm = SimpleNamespace(id=20_000 + n, send=self._on_bot_message)
+        self.answered_at: float | None = None
+        self.started_at = 0.0
+        self.done = asyncio.Event()
+
+    async def create_dm(self):
+        return self.dm
+
+    async def _on_bot_message(self, text: str):
+        now = time.perf_counter()
+        self.sim.sends += 1
+        if self.answered_at is not None:
+            self.sim.prompt_latencies.append((now - self.answered_at) * 1000)
+            self.answered_at = None
+        if text.startswith("**Daily Log Saved**"):
+            self.sim.e2e.append((now - self.started_at) * 1000)
+            self.done.set()
+            return
+        answer = PROMPT_ANSWERS.get(text)
+        if answer is None and self.sim.mode == "paste" and text.startswith("**Daily Log —"):
+            return
+        if answer is not None:
+            if self.sim.mode == "paste" and text == activities.FIELDS[0].prompt:
+                answer = PASTE_BLOCK
+            asyncio.create_task(self._reply(answer))
+
+    async def _reply(self, content: str):
+        await asyncio.sleep(max(0.0, random.gauss(self.sim.think, self.sim.think * self.sim.jitter)))
+        msg = SimpleNamespace(
+            id=next(_message_ids), content=content, author=self, guild=None, channel=self.dm,
+        )
+        self.answered_at = time.perf_counter()
+        await self.sim.cog.on_message(msg)
+
+
+class Simulation:
+    def __init__(self, args):
+        self.args = args
+        self.mode = args.mode
+        self.think = args.think_ms / 1000
+        self.jitter = args.think_jitter
+        self.prompt_latencies: list[float] = []
+        self.e2e: list[float] = []
+        self.loop_lag: list[float] = []
+        self.sends = 0
+        self.webhook_posts = 0
+        self.webhook_records = 0
+        self.cog: activities.ActivityCog | None = None
+
+    async def _stub_webhook(self):
+        async def handle(request: web.Request) -> web.Response:
+            body = await request.json()
+            await asyncio.sleep(self.args.webhook_ms / 1000)
+            self.webhook_posts += 1
+            self.webhook_records += len(body) if isinstance(body, list) else 1
+            return web.json_response({"status": "success"})
+
+        app = web.Application()
+        app.router.add_post("/hook", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/hook"
+
+    async def _ticker(self, stop: asyncio.Event):
+        interval = 0.01
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.loop_lag.append(max(0.0, (time.perf_counter() - t0 - interval) * 1000))
+
+    async def _flow(self, rep: SimRep, delay: float):
+        await asyncio.sleep(delay)
+        rep.started_at = time.perf_counter()
+        if self.mode == "quick":
+            prefill, errors = activities.parse_log_block(PASTE_BLOCK)
+            await self.cog._start_flow(rep, prefill=prefill, prefill_errors=errors)
+        else:
+            await self.cog._start_flow(rep)
+
+    async def run(self) -> dict:
+        a = self.args
+        runner, url = await self._stub_webhook()
+        with tempfile.TemporaryDirectory() as tmp:
+            activities.WEBHOOK_URL = url
+            activities.OUTBOX_PATH = os.path.join(tmp, "outbox.sqlite3") if not a.no_outbox else ""
+            activities.SESSION_STORE_PATH = os.path.join(tmp, "sessions.sqlite3")
+            activities.ACTIVITY_DB_PATH = os.path.join(tmp, "activity.sqlite3")
+            activities.REMINDER_DB_PATH = os.path.join(tmp, "reminders.sqlite3")
+            activities.CSV_FALLBACK_PATH = os.path.join(tmp, "fallback.csv") if a.csv else ""
+            activities.WEBHOOK_BATCH_SIZE = a.batch_size
+            activities.MAX_ACTIVE_FLOWS = a.max_active
+            activities.QUESTION_TIMEOUT = 600
+
+            async with commands.Bot(command_prefix="!", intents=discord.Intents.none()) as bot:
+                self.cog = activities.ActivityCog(bot)
+                await bot.add_cog(self.cog)
+                reps = [SimRep(self, n) for n in range(a.flows)]
+                stop = asyncio.Event()
+                ticker = asyncio.create_task(self._ticker(stop))
+
+                t0 = time.perf_counter()
+                await asyncio.gather(*(self._flow(r, random.uniform(0, a.ramp_s)) for r in reps))
+                flows_elapsed = time.perf_counter() - t0
+                # Let the outbox finish delivering what the flows accepted
+                while self.webhook_records < a.flows and time.perf_counter() - t0 < flows_elapsed + a.drain_timeout:
+                    await asyncio.sleep(0.02)
+                total_elapsed = time.perf_counter() - t0
+
+                stop.set()
+                await ticker
+                await bot.remove_cog(self.cog.qualified_name)
+        await runner.cleanup()
+
+        return {
+            "meta": {
+                "when": dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "python": platform.python_version(),
+                "discord_py": discord.__version__,
+                "args": vars(a),
+            },
+            "flows": a.flows,
+            "completed": len(self.e2e),
+            "flows_per_sec": len(self.e2e) / flows_elapsed if flows_elapsed else 0.0,
+            "prompt_latency_ms": summarize(self.prompt_latencies),
+            "e2e_ms": summarize(self.e2e),
+            "loop_lag_ms": summarize(self.loop_lag),
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "discord_sends": self.sends,
+            "webhook_posts": self.webhook_posts,
+            "webhook_records": self.webhook_records,
+            "webhook_posts_per_sec": self.webhook_posts / total_elapsed if total_elapsed else 0.0,
+        }
+
+
+def _report(r: dict, previous: dict | None):
+    def row(label, key, sub=None, fmt="{:.2f}"):
+        cur = r[key][sub] if sub else r[key]
+        line = f"{label:<28} {fmt.format(cur):>12}"
+        if previous is not None:
+            old = previous[key][sub] if sub else previous[key]
+            delta = (cur - old) / old * 100 if old else 0.0
+            line += f" {fmt.format(old):>12} {delta:>+8.1f}%"
+        print(line)
+
+    print(f"{'metric':<28} {'this run':>12}" + (f" {'previous':>12} {'change':>9}" if previous else ""))
+    row("completed flows", "completed", fmt="{:.0f}")
+    row("flows/sec", "flows_per_sec")
+    for q in ("p50", "p95", "p99"):
+        row(f"per-prompt latency {q} ms", "prompt_latency_ms", q)
+    for q in ("p50", "p95", "p99"):
+        row(f"end-to-end {q} ms", "e2e_ms", q)
+    row("event-loop lag p99 ms", "loop_lag_ms", "p99")
+    row("event-loop lag max ms", "loop_lag_ms", "max")
+    row("peak RSS MB", "peak_rss_mb", fmt="{:.1f}")
+    row("discord sends", "discord_sends", fmt="{:.0f}")
+    row("webhook posts/sec", "webhook_posts_per_sec")
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--flows", type=int, default=500, help="concurrent reps")
+    ap.add_argument("--mode", choices=("chat", "paste", "quick"), default="chat",
+                    help="chat: answer every prompt; paste: paste the block as the first answer; quick: /logquick-style prefill")
+    ap.add_argument("--think-ms", type=float, default=300.0, help="mean human think time per answer")
+    ap.add_argument("--think-jitter", type=float, default=0.3, help="think time std-dev as a fraction of the mean")
+    ap.add_argument("--ramp-s", type=float, default=5.0, help="spread flow starts over this many seconds")
+    ap.add_argument("--webhook-ms", type=float, default=50.0, help="stub webhook response latency")
+    ap.add_argument("--batch-size", type=int, default=1, help="WEBHOOK_BATCH_SIZE")
+    ap.add_argument("--no-outbox", action="store_true", help="post inline instead of through the outbox")
+    ap.add_argument("--csv", action="store_true", help="also enable the CSV fallback sink")
+    ap.add_argument("--max-active", type=int, default=0, help="MAX_ACTIVE_FLOWS (0 = unlimited)")
+    ap.add_argument("--drain-timeout", type=float, default=30.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="previous results JSON to diff against")
+    args = ap.parse_args()
+    random.seed(args.seed)
+
+    results = await Simulation(args).run()
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    _report(results, previous)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Benchmark: DM confirmation latency vs. slow sinks.
+
+Drives ``ActivityCog._submit`` with stub sinks: a fast required sink (the
+accepted-record write) plus best-effort sinks that sleep for a configurable
+delay, one that raises and one that hangs past its timeout. Confirmation
+time should stay flat as the slow sinks get slower; the sequential column
+shows what the old one-after-another order would have cost.
+
+    python bench/sink_pipeline.py --delays 0 250 1000 3000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import activities  # noqa: E402
+from sinks import Sink, SinkPipeline  # noqa: E402
+
+VALUES = {
+    "start_time": "9:00 AM", "end_time": "5:30 PM", "knocks_total": 40, "knocks_category": "CODENOX",
+    "presentations_no_sale": 3, "not_interested": 12, "sales_count": 2, "ap_amount": 1243.5, "carrier": "Aetna",
+    "dials_made": 30, "appts_booked_total": 4, "appts_booked_from_dials": 2, "had_cold": False, "had_leads": False,
+}
+
+
+class _DM:
+    id = 1
+
+    def __init__(self):
+        self.confirmed_at = None
+
+    async def send(self, text):
+        if self.confirmed_at is None:
+            self.confirmed_at = time.perf_counter()
+
+
+def _sleeper(seconds: float):
+    async def handler(payload):
+        await asyncio.sleep(seconds)
+    return handler
+
+
+async def _boom(payload):
+    raise RuntimeError("stub sink failure")
+
+
+async def run(delay: float) -> dict:
+    cog = activities.ActivityCog(SimpleNamespace())
+    cog._pipeline = SinkPipeline([
+        Sink("accept", _sleeper(0.005), timeout=5, required=True),
+        Sink("slow_store", _sleeper(delay), timeout=delay + 1),
+        Sink("slow_csv", _sleeper(delay), timeout=delay + 1),
+        Sink("slow_channel", _sleeper(delay), timeout=delay + 1, after_accept=True),
+        Sink("broken", _boom, timeout=1),
+        Sink("hung", _sleeper(3600), timeout=max(0.05, delay)),
+    ])
+    dm = _DM()
+    user = SimpleNamespace(id=7, name="rep", display_name="Rep")
+    t0 = time.perf_counter()
+    await cog._submit(dm, user, dict(VALUES))
+    confirm_ms = (dm.confirmed_at - t0) * 1000
+    await cog._pipeline.drain(timeout=delay + 5)
+    return {"confirm_ms": confirm_ms, "sequential_ms": 5 + 3 * delay * 1000, "stats": cog._pipeline.stats}
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--delays", type=float, nargs="*", default=[0, 250, 1000, 3000], help="slow sink delay (ms)")
+    args = ap.parse_args()
+
+    rows = []
+    for d in args.delays:
+        rows.append((d, await run(d / 1000)))
+    print(f"\n{'slow sink ms':>12} {'confirm ms':>11} {'sequential ms':>14}")
+    for d, r in rows:
+        print(f"{d:>12.0f} {r['confirm_ms']:>11.1f} {r['sequential_ms']:>14.0f}")
+    print("\nper-sink latency (last run):")
+    for name, st in rows[-1][1]["stats"].items():
+        print(f"  {name:<13} avg {st.avg_ms:>8.1f} ms  max {st.max_ms:>8.1f} ms  failures {st.failures}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Benchmark: outbox delivery throughput for webhook batch sizes 1, 10 and 50.
+
+Enqueues records into a temporary outbox and measures how fast the worker
+drains them into a local stub receiver. The stub adds a fixed per-request
+latency (default 50 ms) to stand in for Zapier's round trip.
+
+    python bench/webhook_batch.py --records 1000 --latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import activities  # noqa: E402
+from outbox import Outbox, OutboxWorker  # noqa: E402
+
+
+async def _start_stub(latency_ms: float, fail_every: int):
+    stats = {"requests": 0, "records": 0}
+
+    async def handle(request: web.Request) -> web.Response:
+        body = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(latency_ms / 1000)
+        items = body if isinstance(body, list) else [body]
+        failed = []
+        for item in items:
+            stats["records"] += 1
+            if fail_every and stats["records"] % fail_every == 0:
+                failed.append(item["idempotency_key"])
+        if not isinstance(body, list) and failed:
+            return web.Response(status=503, text="rejected")
+        return web.json_response({"status": "success", "failed": failed})
+
+    app = web.Application()
+    app.router.add_post("/hook", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/hook", stats
+
+
+async def _run(batch_size: int, records: int, concurrency: int, latency_ms: float, fail_every: int) -> dict:
+    runner, url, stats = await _start_stub(latency_ms, fail_every)
+    activities.WEBHOOK_URL = url
+    cog = activities.ActivityCog(bot=None)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Outbox(os.path.join(tmp, "outbox.sqlite3"))
+        for i in range(records):
+            store.put(f"rec-{i}", {"idempotency_key": f"rec-{i}", "knocks_total": i})
+        worker = OutboxWorker(
+            store,
+            cog._post_webhook,
+            concurrency=concurrency,
+            base_delay=0.01,
+            max_delay=0.05,
+            post_batch=cog._post_webhook_batch if batch_size > 1 else None,
+            batch_size=batch_size,
+            batch_linger=0.05,
+        )
+        t0 = time.perf_counter()
+        worker.start()
+        while store.pending():
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - t0
+        await worker.stop()
+        store.close()
+    await cog.cog_unload()
+    await runner.cleanup()
+    return {"records_per_sec": records / elapsed, "posts": stats["requests"], "seconds": elapsed}
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--records", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=4, help="OUTBOX_CONCURRENCY")
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--fail-every", type=int, default=0, help="receiver rejects every Nth record it sees (exercises partial-batch retries)")
+    args = ap.parse_args()
+
+    print(f"{'batch':>5} {'records/s':>10} {'POSTs':>7} {'seconds':>8}")
+    for batch_size in (1, 10, 50):
+        r = await _run(batch_size, args.records, args.concurrency, args.latency_ms, args.fail_every)
+        print(f"{batch_size:>5} {r['records_per_sec']:>10.1f} {r['posts']:>7} {r['seconds']:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Benchmark: per-call ClientSession vs the cog's pooled webhook session.
+
+Runs a local aiohttp stub receiver and fires POSTs at it through
+``ActivityCog._post_webhook`` (pooled) and through the pre-pooling
+implementation (new ClientSession per call).
+
+    python bench/webhook_pool.py --posts 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+import discord
+from aiohttp import web
+from discord.ext import commands
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import activities  # noqa: E402
+
+
+async def _stub_app(latency_ms: float) -> web.Application:
+    async def handle(request: web.Request) -> web.Response:
+        await request.read()
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return web.json_response({"status": "success"})
+
+    app = web.Application()
+    app.router.add_post("/hook", handle)
+    return app
+
+
+async def _per_call_post(url: str, data: dict) -> tuple[bool, str | None]:
+    # The original implementation: a fresh session (and connector) per post
+    try:
+        async with aiohttp.ClientSession(raise_for_status=False) as session:
+            async with session.post(url, json=data, headers={"Content-Type": "application/json"}, timeout=10) as resp:
+                if 200 <= resp.status < 300:
+                    return True, None
+                text = await resp.text()
+                return False, f"HTTP {resp.status}: {text[:300]}"
+    except Exception as e:
+        return False, str(e)
+
+
+async def _run(post, posts: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failures = 0
+    data = {"knocks_total": 42, "idempotency_key": "bench"}
+
+    async def one():
+        nonlocal failures
+        async with sem:
+            t0 = time.perf_counter()
+            ok, _ = await post(data)
+            latencies.append(time.perf_counter() - t0)
+            if not ok:
+                failures += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(posts)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "posts_per_sec": posts / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+        "failures": failures,
+    }
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--posts", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="artificial stub receiver latency")
+    args = ap.parse_args()
+
+    runner = web.AppRunner(await _stub_app(args.latency_ms))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/hook"
+    activities.WEBHOOK_URL = url
+    # Only the HTTP path is measured: keep the cog's on-disk stores out of the working directory
+    activities.OUTBOX_PATH = activities.SESSION_STORE_PATH = activities.ACTIVITY_DB_PATH = activities.REMINDER_DB_PATH = ""
+
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    cog = activities.ActivityCog(bot)
+    await cog.cog_load()
+    try:
+        results = {
+            "per_call_session": await _run(lambda d: _per_call_post(url, d), args.posts, args.concurrency),
+            "pooled_session": await _run(cog._post_webhook, args.posts, args.concurrency),
+        }
+    finally:
+        await cog.cog_unload()
+        await runner.cleanup()
+
+    print(f"{'mode':<18} {'posts/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'fail':>5}")
+    for name, r in results.items():
+        print(f"{name:<18} {r['posts_per_sec']:>10.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['failures']:>5}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
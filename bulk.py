@@ -0,0 +1,143 @@
+import csv
+import glob
+import gzip
+import os
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterator, Sequence
+
+
+MAX_LINE_BYTES = 1 << 20
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], gzipped: bool = False) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines (newline kept), inflating gzip on the fly in bounded steps."""
+    inflate = zlib.decompressobj(wbits=31) if gzipped else None
+    rest = b""
+    async for data in chunks:
+        while data:
+            if inflate:
+                out = inflate.decompress(data, MAX_LINE_BYTES)
+                data = inflate.unconsumed_tail
+            else:
+                out, data = data, b""
+            rest += out
+            if b"\n" in rest:
+                *lines, rest = rest.split(b"\n")
+                for line in lines:
+                    yield line + b"\n"
+            if len(rest) > MAX_LINE_BYTES:
+                raise ValueError(f"line longer than {MAX_LINE_BYTES} bytes")
+    if inflate:
+        *lines, rest = (rest + inflate.flush()).split(b"\n")
+        for line in lines:
+            yield line + b"\n"
+    if rest:
+        yield rest
+
+
+async def iter_csv_records(lines: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, list[str]]]:
+    """Parse CSV records from a byte stream of lines as it arrives; yields (line number, fields).
+
+    Lines are joined while a quoted field is still open, so values with embedded newlines survive.
+    Only the current record is held in memory.
+    """
+    pending: list[str] = []
+    quotes = 0
+    line_no = start = 0
+    async for raw in lines:
+        line_no += 1
+        text = raw.decode("utf-8-sig" if line_no == 1 else "utf-8", errors="replace")
+        if not pending:
+            start = line_no
+        pending.append(text)
+        quotes += text.count('"')
+        if quotes % 2:
+            continue
+        record, pending, quotes = "".join(pending), [], 0
+        if record.strip():
+            yield start, next(csv.reader([record]))
+    if pending and "".join(pending).strip():
+        yield start, next(csv.reader(["".join(pending)]))
+
+
+def read_csv_logs(path: str) -> Iterator[Dict[str, str]]:
+    """Rows of the CSV fallback as dicts, oldest file first (rotated files, then the live one). Blocking."""
+    stem, ext = os.path.splitext(path)
+    files = sorted(glob.glob(f"{glob.escape(stem)}-*{ext or '.csv'}"))
+    if os.path.exists(path):
+        files.append(path)
+    for name in files:
+        with open(name, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+
+class GzipCsvParts:
+    """Writes CSV rows into gzip files of roughly ``part_bytes`` compressed each, so every part fits
+    in one Discord attachment. Blocking; ``close`` returns the part paths."""
+
+    def __init__(self, directory: str, stem: str, header: Sequence[str], part_bytes: int):
+        self.directory = directory
+        self.stem = stem
+        self.header = list(header)
+        self.part_bytes = part_bytes
+        self.paths: list[str] = []
+        self._raw = None
+        self._gz = None
+        self._text = None
+        self._writer = None
+        self._rows_in_part = 0
+
+    def _open(self):
+        path = os.path.join(self.directory, f"{self.stem}-part{len(self.paths) + 1}.csv.gz")
+        self._raw = open(path, "wb")
+        self._gz = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self._text = _TextSink(self._gz)
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(self.header)
+        self._rows_in_part = 0
+        self.paths.append(path)
+
+    def _close_part(self):
+        if self._gz is not None:
+            self._gz.close()
+            self._raw.close()
+            self._raw = self._gz = self._text = self._writer = None
+
+    def write(self, row: Sequence[Any]):
+        # The compressor buffers, so the file size is only checked every so often (parts run slightly over)
+        if self._writer is None or (self._rows_in_part % 1000 == 0 and self._rows_in_part
+                                    and self._raw.tell() >= self.part_bytes):
+            self._close_part()
+            self._open()
+        self._writer.writerow(row)
+        self._rows_in_part += 1
+
+    def close(self) -> list[str]:
+        self._close_part()
+        return self.paths
+
+
+class _TextSink:
+    """Minimal text-mode ``write`` over a binary stream for csv.writer."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def write(self, text: str):
+        return self.raw.write(text.encode("utf-8"))
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    sent: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    failed: int = 0
+    errors: list[str] = field(default_factory=list)
+    max_errors: int = 12
+
+    def error(self, line: int, message: str):
+        if len(self.errors) < self.max_errors:
+            self.errors.append(f"line {line}: {message[:120]}")
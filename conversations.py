@@ -0,0 +1,204 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+
+class Conversation:
+    """One active DM flow. Replies are queued here by the router."""
+
+    __slots__ = ("key", "queue", "after_id", "timed_out", "prompt", "last_active")
+
+    # Replies beyond this many unread ones are dropped (bounds memory if someone floods the DM)
+    MAX_PENDING = 20
+
+    def __init__(self, user_id: int, channel_id: int, after_id: int = 0):
+        self.key = (user_id, channel_id)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_PENDING)
+        # Messages at or before this snowflake (e.g. the `!logday` that started the flow) are not answers
+        self.after_id = after_id
+        self.timed_out = False
+        self.prompt: Optional[str] = None           # question currently waiting for an answer
+        self.last_active = time.monotonic()         # last reply from the rep (for idle eviction)
+
+    async def next_message(self, timeout: Optional[float]) -> Any:
+        """Next reply in this conversation; raises asyncio.TimeoutError like ``bot.wait_for``."""
+        return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+
+
+class ConversationRouter:
+    """Routes incoming messages to active flows with one dict lookup, instead of one
+    ``bot.wait_for`` predicate per pending question."""
+
+    def __init__(self):
+        self._sessions: Dict[tuple[int, int], Conversation] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def open(self, user_id: int, channel_id: int, after_id: int = 0) -> Conversation:
+        conv = Conversation(user_id, channel_id, after_id)
+        self._sessions[conv.key] = conv
+        return conv
+
+    def close(self, conv: Conversation):
+        # Only drop the mapping if it still points at this conversation (a newer flow may have replaced it)
+        if self._sessions.get(conv.key) is conv:
+            del self._sessions[conv.key]
+
+    def get(self, user_id: int, channel_id: int) -> Optional[Conversation]:
+        return self._sessions.get((user_id, channel_id))
+
+    def dispatch(self, message: Any) -> bool:
+        """Hand a message to its conversation, if any. Returns True when it was consumed."""
+        conv = self._sessions.get((message.author.id, message.channel.id))
+        if conv is None or message.id <= conv.after_id:
+            return False
+        conv.last_active = time.monotonic()
+        try:
+            conv.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+        return True
+
+
+class FlowEntry:
+    """A rep's flow as the FlowManager sees it: waiting for a slot, then running."""
+
+    __slots__ = ("user_id", "task", "conv", "admitted")
+
+    def __init__(self, user_id: int, task: Optional[asyncio.Task]):
+        self.user_id = user_id
+        self.task = task
+        self.conv: Optional[Conversation] = None
+        self.admitted = False
+
+
+class FlowBusy(Exception):
+    """The rep already has a flow, and the one being admitted doesn't replace it."""
+
+    def __init__(self, entry: FlowEntry):
+        super().__init__(f"user {entry.user_id} already has a flow")
+        self.entry = entry
+
+
+class FlowManager:
+    """Admission control for DM flows.
+
+    - One flow per rep: ``get`` finds the rep's queued or running flow so callers can resume or
+      replace it instead of stacking a second one, and ``admit`` enforces it for callers that
+      raced past that check.
+    - A global cap of ``max_active`` running flows (0 = unlimited). Extra reps wait in a FIFO line
+      and a freed slot goes straight to the head of the line.
+    - ``evict_idle`` cancels running flows whose rep has gone quiet, but only while others are waiting.
+    """
+
+    def __init__(self, max_active: int, queue_timeout: float, idle_evict: float):
+        self.max_active = max_active
+        self.queue_timeout = queue_timeout
+        self.idle_evict = idle_evict
+        self._entries: Dict[int, FlowEntry] = {}
+        self._waiters: "OrderedDict[int, asyncio.Future]" = OrderedDict()
+        self._active = 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def get(self, user_id: int) -> Optional[FlowEntry]:
+        return self._entries.get(user_id)
+
+    def position(self, user_id: int) -> int:
+        """1-based place in line, or 0 if not waiting."""
+        for n, uid in enumerate(self._waiters, start=1):
+            if uid == user_id:
+                return n
+        return 0
+
+    async def admit(self, user_id: int, notify: Callable[[int], Awaitable[None]], replace: bool = False) -> Optional[FlowEntry]:
+        """Wait for a slot for the current task. ``notify`` is told the rep's place in line if they
+        have to wait. None if the wait timed out.
+
+        If the rep already has a flow, it is cancelled first with ``replace``; otherwise FlowBusy is raised.
+        """
+        while (current := self._entries.get(user_id)) is not None:
+            if not replace:
+                raise FlowBusy(current)
+            if current.task is not None and current.task is not asyncio.current_task() and not current.task.done():
+                await self.replace(user_id)
+            if self._entries.get(user_id) is current:
+                self.release(current)   # its task ended without releasing it (e.g. cancelled before it ran)
+        # No await between the check above and claiming the rep's entry
+        entry = FlowEntry(user_id, asyncio.current_task())
+        self._entries[user_id] = entry
+        if self.max_active <= 0 or (self._active < self.max_active and not self._waiters):
+            self._active += 1
+            entry.admitted = True
+            return entry
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[user_id] = fut
+        try:
+            try:
+                await notify(self.position(user_id))
+            except Exception as e:
+                print("[flows] Queue notice failed:", e)
+            await asyncio.wait_for(fut, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(entry, fut)
+            return None
+        except asyncio.CancelledError:
+            self._abandon(entry, fut)
+            raise
+        entry.admitted = True
+        return entry
+
+    def _abandon(self, entry: FlowEntry, fut: asyncio.Future):
+        if self._waiters.get(entry.user_id) is fut:
+            del self._waiters[entry.user_id]
+        if fut.done() and not fut.cancelled():
+            # A slot was handed over just as we gave up; pass it on
+            self._release_slot()
+        if self._entries.get(entry.user_id) is entry:
+            del self._entries[entry.user_id]
+
+    async def replace(self, user_id: int):
+        """Cancel the rep's current flow (queued or running) and wait for it to wind down."""
+        entry = self._entries.get(user_id)
+        if entry is None or entry.task is None or entry.task is asyncio.current_task():
+            return
+        entry.task.cancel()
+        await asyncio.wait({entry.task})
+
+    def release(self, entry: FlowEntry):
+        if self._entries.get(entry.user_id) is entry:
+            del self._entries[entry.user_id]
+        if entry.admitted:
+            entry.admitted = False
+            self._release_slot()
+
+    def _release_slot(self):
+        while self._waiters:
+            _, fut = self._waiters.popitem(last=False)
+            if not fut.done():
+                fut.set_result(None)    # the slot moves to the next rep in line
+                return
+        self._active -= 1
+
+    def evict_idle(self) -> list[FlowEntry]:
+        """Cancel running flows idle longer than ``idle_evict`` while reps are waiting for a slot."""
+        if not self._waiters or self.idle_evict <= 0:
+            return []
+        cutoff = time.monotonic() - self.idle_evict
+        evicted = []
+        for entry in list(self._entries.values()):
+            if len(evicted) >= len(self._waiters):
+                break
+            if entry.admitted and entry.conv and entry.conv.last_active < cutoff and entry.task:
+                entry.task.cancel()
+                evicted.append(entry)
+        return evicted
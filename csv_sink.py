@@ -0,0 +1,148 @@
+import csv
+import datetime as dt
+import os
+import queue
+import threading
+import time
+from typing import Optional, Sequence
+
+
+_STOP = object()
+
+
+class CsvSink:
+    """Buffered CSV writer running on its own thread, so disk I/O never blocks the event loop.
+
+    ``write`` only enqueues a row. The thread keeps the file open, writes rows in batches and
+    flushes every ``flush_interval`` seconds or ``flush_rows`` rows. ``rotate`` is ``"none"``,
+    ``"daily"`` (one file per UTC date, e.g. ``logs-2026-10-17.csv``) or ``"size"`` (the current
+    file is renamed with a timestamp once it passes ``max_bytes``). ``close`` drains, flushes
+    and fsyncs.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: Sequence[str],
+        *,
+        rotate: str = "none",
+        max_bytes: int = 50_000_000,
+        flush_interval: float = 1.0,
+        flush_rows: int = 200,
+    ):
+        self.path = path
+        self.header = list(header)
+        self.rotate = rotate
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.errors = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = None
+        self._writer = None
+        self._current_path: Optional[str] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="csv-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, row: Sequence):
+        if self._closed:
+            raise RuntimeError("CSV sink is closed")
+        self._queue.put(row)
+
+    def close(self):
+        """Flush everything queued so far and fsync. Blocking."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    # ---------- Writer thread ----------
+    def _target_path(self) -> str:
+        if self.rotate != "daily":
+            return self.path
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}-{dt.datetime.utcnow().date().isoformat()}{ext or '.csv'}"
+
+    def _open(self, path: str):
+        self._close_file(sync=True)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if self._header_of(path) not in (None, self.header):
+            # Written under an older layout: appending would put values under the wrong columns
+            print(f"[csv] {path} has a different header; starting a new file")
+            self._move_aside(path)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._current_path = path
+        if self._file.tell() == 0:
+            self._writer.writerow(self.header)
+
+    @staticmethod
+    def _header_of(path: str) -> Optional[list[str]]:
+        """First row of an existing, non-empty file; None otherwise."""
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                return next(csv.reader(f), None)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _move_aside(path: str):
+        """Rename ``path`` with a timestamp suffix (next to it, so readers of rotated files still find it)."""
+        stem, ext = os.path.splitext(path)
+        rotated = f"{stem}-{dt.datetime.utcnow().strftime('%Y%m%dT%H%M%S')}"
+        n = 0
+        while os.path.exists(f"{rotated}{'-' + str(n) if n else ''}{ext or '.csv'}"):
+            n += 1
+        os.replace(path, f"{rotated}{'-' + str(n) if n else ''}{ext or '.csv'}")
+
+    def _close_file(self, sync: bool):
+        if self._file is None:
+            return
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = self._writer = None
+
+    def _maybe_rotate(self):
+        path = self._target_path()
+        if path != self._current_path:
+            self._open(path)
+        elif self.rotate == "size" and self._file.tell() >= self.max_bytes:
+            self._close_file(sync=True)
+            self._move_aside(self.path)
+            self._open(self.path)
+
+    def _write_batch(self, rows: list):
+        try:
+            self._maybe_rotate()
+            self._writer.writerows(rows)
+            self._file.flush()
+        except Exception as e:
+            self.errors += len(rows)
+            print(f"[csv] Failed to write {len(rows)} row(s):", e)
+
+    def _run(self):
+        pending: list = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            stop = item is _STOP
+            if item is not None and not stop:
+                pending.append(item)
+            if pending and (stop or len(pending) >= self.flush_rows or time.monotonic() >= deadline):
+                self._write_batch(pending)
+                pending = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if stop:
+                try:
+                    self._close_file(sync=True)
+                except Exception as e:
+                    print("[csv] Final fsync failed:", e)
+                return
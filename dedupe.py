@@ -0,0 +1,65 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional, Callable
+
+
+# (content_hash, idempotency_key) of a rep's current log for a work day
+Entry = tuple[str, str]
+
+
+class DedupeIndex:
+    """The latest accepted log per (user, work day), so resubmissions can be spotted before they fan out.
+
+    Held in memory as an LRU of at most ``capacity`` entries that expire after ``ttl`` seconds.
+    Misses fall back to ``loader`` (the activity store; blocking, run in a thread), so a restart
+    or eviction doesn't forget what was already logged today.
+    """
+
+    def __init__(self, capacity: int, ttl: float, loader: Optional[Callable[[str, str], Optional[Entry]]] = None):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self.loader = loader
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Entry]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, user_id: str, day: str) -> Optional[Entry]:
+        key = (user_id, day)
+        hit = self._entries.get(key)
+        if hit is not None:
+            expires, entry = hit
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry
+            del self._entries[key]
+        if self.loader is None:
+            return None
+        try:
+            entry = await asyncio.to_thread(self.loader, user_id, day)
+        except Exception as e:
+            print("[dedupe] Store lookup failed:", e)
+            return None
+        if entry is not None:
+            self._put(key, entry)
+        return entry
+
+    def remember(self, user_id: str, day: str, content_hash: str, idempotency_key: str):
+        self._put((user_id, day), (content_hash, idempotency_key))
+
+    def forget(self, user_id: str, day: str):
+        self._entries.pop((user_id, day), None)
+
+    def void(self, user_id: str, day: str, idempotency_key: str):
+        """The log keyed ``idempotency_key`` never reached the webhook: if it is still the rep's latest,
+        stop matching resubmissions against it (they are sent again and replace it)."""
+        hit = self._entries.get((user_id, day))
+        if hit is not None and hit[1][1] == idempotency_key:
+            self._entries[(user_id, day)] = (hit[0], ("", idempotency_key))
+
+    def _put(self, key: tuple[str, str], entry: Entry):
+        self._entries[key] = (time.monotonic() + self.ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
@@ -0,0 +1,113 @@
+import asyncio
+from typing import Optional, Any, Callable, Awaitable, Hashable
+
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+class LogDigest:
+    """Buffers accepted logs and posts them to the log channel as one compact table.
+
+    Flushes every ``interval`` seconds, as soon as ``max_entries`` logs are waiting, and on
+    ``close``. Long tables are split so no message passes Discord's 2000-character limit.
+
+    Waiting logs are keyed by ``key``; a newer log with the same key (e.g. a rep's corrected log
+    for the same day) replaces the one already waiting, so it is counted once.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        interval: float,
+        max_entries: int,
+        key: Callable[[Any], Hashable] = id,
+    ):
+        self.send = send
+        self.interval = interval
+        self.max_entries = max(1, max_entries)
+        self.key = key
+        self._entries: dict[Hashable, Any] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._full = asyncio.Event()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="log-digest")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add(self, payload: Any):
+        self._entries[self.key(payload)] = payload
+        if len(self._entries) >= self.max_entries:
+            self._full.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print("[digest] Flush failed:", e)
+
+    async def flush(self):
+        async with self._lock:
+            entries, self._entries = self._entries, {}
+            if not entries:
+                return
+            sent = 0
+            try:
+                for message in format_digest(list(entries.values())):
+                    await self.send(message)
+                    sent += 1
+            except Exception:
+                if not sent:
+                    # Nothing made it out; keep the logs for the next flush (behind any that replaced them)
+                    self._entries = {**entries, **self._entries}
+                raise
+
+
+def format_digest(entries: list[Any]) -> list[str]:
+    """Render logs as a per-rep table plus team totals, split into Discord-sized messages."""
+    header = f"{'Rep':<18} {'NOx':>5} {'Sales':>5} {'AP':>10} {'Dials':>5} {'Appts':>5}"
+    rows = [
+        f"{p.discord_display_name[:18]:<18} {p.knocks_total:>5} {p.sales_count:>5} "
+        f"{p.ap_amount:>10,.2f} {p.dials_made:>5} {p.appts_booked_total:>5}"
+        for p in entries
+    ]
+    title = f"📊 **Daily Log Digest** — {len(entries)} new log{'s' if len(entries) != 1 else ''}"
+    totals = (
+        f"**Team:** NOx **{sum(p.knocks_total for p in entries)}**  •  "
+        f"Sales **{sum(p.sales_count for p in entries)}**  •  "
+        f"AP **${sum(p.ap_amount for p in entries):,.2f}**  •  "
+        f"Dials **{sum(p.dials_made for p in entries)}**  •  "
+        f"Appts **{sum(p.appts_booked_total for p in entries)}**"
+    )
+
+    messages: list[str] = []
+    chunk: list[str] = []
+    # Room for the title / totals line and the code fence around the table
+    budget = DISCORD_MESSAGE_LIMIT - len(title) - len(totals) - len(header) - 16
+    size = 0
+    for row in rows:
+        if chunk and size + len(row) + 1 > budget:
+            messages.append("```\n" + header + "\n" + "\n".join(chunk) + "\n```")
+            chunk, size = [], 0
+        chunk.append(row)
+        size += len(row) + 1
+    messages.append("```\n" + header + "\n" + "\n".join(chunk) + "\n```")
+    messages[0] = title + "\n" + messages[0]
+    messages[-1] = messages[-1] + "\n" + totals
+    return messages
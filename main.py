@@ -1,5 +1,7 @@
 # main.py
 import os
+import time
+import signal
 import asyncio
 import discord
 from discord.ext import commands
@@ -11,18 +13,53 @@ load_dotenv()
 # Bot token (support either DISCORD_TOKEN or DISCORD_BOT_TOKEN)
 TOKEN = os.getenv("DISCORD_TOKEN") or os.getenv("DISCORD_BOT_TOKEN")
 
-# Intents
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
+# Low-memory profile for large guilds: no member list, no chunking at startup, no message cache,
+# and only the intents the activities cog uses. Display names are fetched per rep when a log is saved.
+LOW_MEMORY = os.getenv("LOW_MEMORY", "").strip().lower() in ("1", "true", "yes", "on")
+MAX_MESSAGES = int(os.getenv("MAX_MESSAGES", "0" if LOW_MEMORY else "1000"))  # message cache size (0 = off)
+
+
+def gateway_options(low_memory: bool, max_messages: int) -> dict:
+    """Intents and cache settings for commands.Bot."""
+    if not low_memory:
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        return {"intents": intents, "max_messages": max_messages or None}
+
+    # guilds: slash commands; guild/DM messages: `!` commands and DM replies.
+    # Message content is only needed for `!` commands in server channels (DMs always carry it).
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.dm_messages = True
+    intents.message_content = True
+    return {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": max_messages or None,
+    }
+
 
 # Bot instance
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = commands.Bot(command_prefix="!", **gateway_options(LOW_MEMORY, MAX_MESSAGES))
+
+# Startup timing (time-to-ready is logged once; later on_ready events are gateway reconnects)
+_started = time.perf_counter()
+_ready_once = False
 
 # --- Minimal health checks ---
 @bot.event
 async def on_ready():
-    print(f"✅ {bot.user} is online (ID: {bot.user.id})")
+    global _ready_once
+    if _ready_once:
+        print(f"🔁 {bot.user} reconnected")
+        return
+    _ready_once = True
+    if LOW_MEMORY:
+        print("🪶 Low-memory gateway profile (no member cache, no chunking)")
+    print(f"✅ {bot.user} is online (ID: {bot.user.id}) — ready in {time.perf_counter() - _started:.2f}s")
 
 @bot.command(name="hello")
 async def hello(ctx: commands.Context):
@@ -39,13 +76,23 @@ async def _startup():
         raise SystemExit(f"❌ Failed to import activities cog: {e}")
 
     try:
+        t0 = time.perf_counter()
         await bot.add_cog(ActivityCog(bot))
-        print("📦 Loaded Activities cog")
+        print(f"📦 Loaded Activities cog in {time.perf_counter() - t0:.2f}s")
     except Exception as e:
         raise SystemExit(f"❌ Failed to add Activities cog: {e}")
 
-    # Start the bot
-    await bot.start(TOKEN)
+    # Start the bot. Leaving the block closes it, which unloads the cog so buffered CSV rows,
+    # the pending digest and the outbox are flushed before the process exits.
+    async with bot:
+        # Render stops the service with SIGTERM; shut down cleanly instead of dying mid-write
+        loop = asyncio.get_running_loop()
+        closing: set[asyncio.Task] = set()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, lambda: closing.add(loop.create_task(bot.close())))
+        except NotImplementedError:
+            pass    # no signal handlers on Windows event loops
+        await bot.start(TOKEN)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,154 @@
+import asyncio
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Callable
+
+from aiohttp import web
+
+
+LabelKey = tuple[tuple[str, str], ...]
+
+# Seconds; covers sub-millisecond local work up to multi-minute human waits
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 180, 600)
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = _key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_fmt_labels(k)} {v:g}" for k, v in self.values.items()]
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Optional[Callable[[], float]] = None):
+        self.name, self.help = name, help
+        self.fn = fn
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def render(self) -> list[str]:
+        return [f"{self.name} {self.fn() if self.fn else self.value:g}"]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self.series: Dict[LabelKey, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = _key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def quantile(self, q: float, **labels: str) -> float:
+        """Bucket-resolution estimate (upper bound of the bucket holding the q-th observation)."""
+        series = self.series.get(_key(labels))
+        if not series:
+            return 0.0
+        counts = series[0]
+        target = q * sum(counts)
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= target and c:
+                return self.buckets[i] if i < len(self.buckets) else math.inf
+        return 0.0
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {total[0]:g}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Counter | Gauge | Histogram] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help))
+
+    def gauge(self, name: str, help: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.metrics.setdefault(name, Gauge(name, help, fn))
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for m in self.metrics.values():
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+async def watch_loop_lag(hist: Histogram, interval: float = 0.5):
+    """Record how late the event loop wakes a sleeping task (a direct read of loop stalls)."""
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        hist.observe(max(0.0, time.perf_counter() - t0 - interval))
+
+
+async def serve(registry: Registry, host: str, port: int) -> web.AppRunner:
+    """Expose ``registry`` at http://host:port/metrics. Returns the runner (call ``cleanup`` to stop)."""
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,318 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+import asyncio
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+
+PostFn = Callable[[Dict[str, Any]], Awaitable[tuple[bool, Optional[str]]]]
+# Takes a list of records, returns {idempotency_key: error} for the records that were NOT accepted
+PostBatchFn = Callable[[list[Dict[str, Any]]], Awaitable[Dict[str, str]]]
+
+# Client errors worth retrying; any other "HTTP 4xx" from the post function means the receiver
+# will never take the record as it is
+RETRYABLE_STATUS = {408, 425, 429}
+
+
+# ----------------- DURABLE STORE -----------------
+class Outbox:
+    """Append-only SQLite outbox. Rows stay until the webhook acknowledges them.
+
+    Records that can never be delivered are kept as dead letters (``dead = 1``, with the last
+    error) instead of being deleted, and are no longer picked up for delivery.
+
+    Methods are blocking; call them through ``asyncio.to_thread`` from the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                created REAL NOT NULL,
+                last_error TEXT,
+                dead INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(outbox)")}
+        if "dead" not in existing:
+            self._db.execute("ALTER TABLE outbox ADD COLUMN dead INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_next_attempt ON outbox (next_attempt)")
+
+    def put(self, key: str, data: Dict[str, Any]) -> bool:
+        """Persist a record. Returns False if the key is already queued; a dead letter with the key is queued again."""
+        now = time.time()
+        payload = json.dumps(data, separators=(",", ":"))
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, payload, next_attempt, created) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            if cur.rowcount == 1:
+                return True
+            cur = self._db.execute(
+                "UPDATE outbox SET payload = ?, attempts = 0, next_attempt = ?, last_error = NULL, dead = 0 "
+                "WHERE idempotency_key = ? AND dead = 1",
+                (payload, now, key),
+            )
+            return cur.rowcount == 1
+
+    def due(self, now: float, limit: int) -> list[tuple[int, Dict[str, Any], int]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, payload, attempts FROM outbox WHERE dead = 0 AND next_attempt <= ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+        return [(row_id, json.loads(payload), attempts) for row_id, payload, attempts in rows]
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute("SELECT MIN(next_attempt) FROM outbox WHERE dead = 0").fetchone()
+        return row[0] if row else None
+
+    def ack(self, ids: list[int]):
+        if not ids:
+            return
+        with self._lock:
+            self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, row_id: int, attempts: int, next_attempt: float, error: Optional[str]):
+        with self._lock:
+            self._db.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                (attempts, next_attempt, (error or "")[:500], row_id),
+            )
+
+    def dead_letter(self, row_id: int, attempts: int, error: Optional[str]):
+        with self._lock:
+            self._db.execute(
+                "UPDATE outbox SET attempts = ?, last_error = ?, dead = 1 WHERE id = ?",
+                (attempts, (error or "")[:500], row_id),
+            )
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox WHERE dead = 0").fetchone()[0]
+
+    def is_dead(self, key: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM outbox WHERE idempotency_key = ? AND dead = 1", (key,)).fetchone() is not None
+
+    def dead_letters(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox WHERE dead = 1").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ----------------- RETRY POLICY -----------------
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempts - 1))))
+
+
+def is_permanent(error: Optional[str]) -> bool:
+    """True for an ``HTTP 4xx: ...`` error (as the webhook post functions report them) that retrying can't fix."""
+    if not error or not error.startswith("HTTP 4"):
+        return False
+    try:
+        status = int(error[5:8])
+    except ValueError:
+        return False
+    return status not in RETRYABLE_STATUS
+
+
+class CircuitBreaker:
+    """Stops hammering the webhook after repeated failures; lets one probe through after ``reset_after``."""
+
+    def __init__(self, failure_threshold: int, reset_after: float):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_after - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+# ----------------- BACKGROUND DELIVERY -----------------
+class OutboxWorker:
+    """Drains the outbox in the background, replaying anything left over from a previous run.
+
+    A record is dead-lettered after ``max_attempts`` failed deliveries (0 = retry forever), or at
+    once when the receiver rejects it outright (a non-retryable 4xx). Rejections mean the webhook
+    is up, so they don't count toward the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        post: PostFn,
+        *,
+        concurrency: int = 4,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        max_attempts: int = 0,
+        breaker: Optional[CircuitBreaker] = None,
+        post_batch: Optional[PostBatchFn] = None,
+        batch_size: int = 1,
+        batch_linger: float = 0.0,
+        on_dead_letter: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.outbox = outbox
+        self.post = post
+        self.post_batch = post_batch
+        self.batch_size = max(1, batch_size) if post_batch else 1
+        self.batch_linger = batch_linger
+        self._linger_started: Optional[float] = None
+        self.concurrency = max(1, concurrency)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max(0, max_attempts)
+        self.on_dead_letter = on_dead_letter
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_after=60.0)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="outbox-worker")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def enqueue(self, key: str, data: Dict[str, Any]) -> bool:
+        added = await asyncio.to_thread(self.outbox.put, key, data)
+        self._wake.set()
+        return added
+
+    async def _sleep(self, seconds: float):
+        # Wakes early when a new record is enqueued
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            try:
+                if self.breaker.state == "open":
+                    await asyncio.sleep(self.breaker.retry_in())
+                    continue
+
+                # Half-open: a single probe record decides whether the breaker closes again
+                half_open = self.breaker.state == "half-open"
+                limit = 1 if half_open else self.concurrency * self.batch_size
+                self._wake.clear()
+                rows = await asyncio.to_thread(self.outbox.due, time.time(), limit)
+                if not rows:
+                    self._linger_started = None
+                    next_due = await asyncio.to_thread(self.outbox.next_due)
+                    await self._sleep(60.0 if next_due is None else next_due - time.time())
+                    continue
+
+                if self.batch_size == 1:
+                    await asyncio.gather(*(self._deliver(*row) for row in rows))
+                    continue
+
+                # Batch mode: hold a partial batch for up to batch_linger seconds so more records can join
+                if len(rows) < self.batch_size and not half_open:
+                    now = time.monotonic()
+                    if self._linger_started is None:
+                        self._linger_started = now
+                    remaining = self.batch_linger - (now - self._linger_started)
+                    if remaining > 0:
+                        await self._sleep(remaining)
+                        continue
+                self._linger_started = None
+                batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+                await asyncio.gather(*(self._deliver_batch(b) for b in batches))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[outbox] Worker error:", e)
+                await asyncio.sleep(1.0)
+
+    async def _deliver(self, row_id: int, data: Dict[str, Any], attempts: int):
+        ok, err = await self.post(data)
+        if ok:
+            self.breaker.record_success()
+            await asyncio.to_thread(self.outbox.ack, [row_id])
+            return
+        if is_permanent(err):
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        await self._fail(row_id, data, attempts + 1, err, permanent=is_permanent(err))
+
+    async def _fail(self, row_id: int, data: Dict[str, Any], attempts: int, err: Optional[str], permanent: bool = False):
+        """Schedule a retry, or dead-letter the record if it was rejected outright or is out of attempts."""
+        if permanent or (self.max_attempts and attempts >= self.max_attempts):
+            await asyncio.to_thread(self.outbox.dead_letter, row_id, attempts, err)
+            print(f"[outbox] Gave up on {data.get('idempotency_key')} after {attempts} attempt(s): {err}")
+            if self.on_dead_letter:
+                self.on_dead_letter(data)
+            return
+        delay = backoff_delay(attempts, self.base_delay, self.max_delay)
+        await asyncio.to_thread(self.outbox.retry, row_id, attempts, time.time() + delay, err)
+        print(f"[outbox] Delivery failed (attempt {attempts}, retry in {delay:.1f}s): {err}")
+
+    async def _deliver_batch(self, rows: list[tuple[int, Dict[str, Any], int]]):
+        failed = await self.post_batch([data for _, data, _ in rows])
+        delivered = [row_id for row_id, data, _ in rows if data.get("idempotency_key") not in failed]
+        if delivered:
+            self.breaker.record_success()
+            await asyncio.to_thread(self.outbox.ack, delivered)
+        if not failed:
+            return
+        # A 4xx for the whole batch can't say which record was bad, so those fall back to max_attempts
+        whole_batch = len(rows) > 1 and not delivered
+        rejected = not whole_batch and all(is_permanent(err) for err in failed.values())
+        if not delivered and not rejected:
+            self.breaker.record_failure()
+        # Only the records the receiver rejected go back on the schedule
+        for row_id, data, attempts in rows:
+            err = failed.get(data.get("idempotency_key"))
+            if err is None:
+                continue
+            await self._fail(row_id, data, attempts + 1, err, permanent=not whole_batch and is_permanent(err))
+        print(f"[outbox] Batch delivery: {len(delivered)} ok, {len(rows) - len(delivered)} failed")
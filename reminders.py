@@ -0,0 +1,272 @@
+import asyncio
+import datetime as dt
+import heapq
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, Callable, Awaitable, Iterable
+from zoneinfo import ZoneInfo
+
+
+@dataclass
+class Reminder:
+    user_id: int
+    tz: str
+    remind_at: dt.time
+    last_sent: str = ""      # rep-local date of the last reminder sent
+    last_logged: str = ""    # rep-local date of the rep's last log
+
+
+class ReminderStore:
+    """Reps enrolled in daily reminders, with what was last sent / logged, so the schedule survives restarts.
+
+    Methods are blocking; call them through ``asyncio.to_thread`` from the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reminders (
+                user_id INTEGER PRIMARY KEY,
+                tz TEXT NOT NULL,
+                remind_at TEXT NOT NULL,
+                last_sent TEXT NOT NULL DEFAULT '',
+                last_logged TEXT NOT NULL DEFAULT ''
+            )
+            """
+        )
+
+    def save(self, r: Reminder):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reminders (user_id, tz, remind_at, last_sent, last_logged) VALUES (?, ?, ?, ?, ?)",
+                (r.user_id, r.tz, r.remind_at.strftime("%H:%M"), r.last_sent, r.last_logged),
+            )
+
+    def delete(self, user_id: int):
+        with self._lock:
+            self._db.execute("DELETE FROM reminders WHERE user_id = ?", (user_id,))
+
+    def mark_sent(self, sent: Iterable[tuple[int, str]]):
+        with self._lock:
+            self._db.executemany("UPDATE reminders SET last_sent = ? WHERE user_id = ?", [(day, uid) for uid, day in sent])
+
+    def mark_logged(self, user_id: int, day: str):
+        with self._lock:
+            self._db.execute("UPDATE reminders SET last_logged = ? WHERE user_id = ?", (day, user_id))
+
+    def all(self) -> list[Reminder]:
+        with self._lock:
+            rows = self._db.execute("SELECT user_id, tz, remind_at, last_sent, last_logged FROM reminders").fetchall()
+        return [Reminder(uid, tz, dt.time.fromisoformat(at), sent, logged) for uid, tz, at, sent, logged in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ReminderScheduler:
+    """Sends each enrolled rep one reminder per work day at their local time, unless they already logged.
+
+    Next-due times live in one min-heap per timezone (reps in a zone share "today"), so the loop
+    only looks at heap heads and sleeps until the earliest one; nothing ever walks the roster.
+    A rep's current due time is kept in ``_due``; heap items that no longer match it (rescheduled
+    or removed reps) are dropped when they surface. Due reps are DMed in batches of ``batch_size``,
+    paced to at most ``rate`` DMs per second.
+    """
+
+    def __init__(
+        self,
+        store: ReminderStore,
+        send: Callable[[int], Awaitable[None]],
+        *,
+        days: set[int],
+        rate: float = 5.0,
+        batch_size: int = 10,
+        catchup: float = 3 * 3600,
+        clock: Callable[[], float] = time.time,
+        on_result: Optional[Callable[[str], None]] = None,
+    ):
+        self.store = store
+        self.send = send
+        self.days = days                # weekdays (Monday = 0) reminders go out
+        self.rate = max(0.1, rate)
+        self.batch_size = max(1, batch_size)
+        self.catchup = catchup          # after a restart, still send reminders missed by up to this many seconds
+        self.clock = clock
+        self.on_result = on_result
+        self._reminders: Dict[int, Reminder] = {}
+        self._heaps: Dict[str, list[tuple[float, int]]] = {}
+        self._due: Dict[int, float] = {}
+        self._wake = asyncio.Event()
+        self._sleep_until: Optional[float] = None   # when the idle loop next wakes on its own
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._reminders)
+
+    async def start(self):
+        """Rebuild every rep's next reminder from the store and start the loop."""
+        now = self.clock()
+        for r in await asyncio.to_thread(self.store.all):
+            self._reminders[r.user_id] = r
+            self._schedule(r, now, catchup=True)
+        self._task = asyncio.create_task(self._run(), name="reminders")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ---------- Roster changes ----------
+    def get(self, user_id: int) -> Optional[Reminder]:
+        return self._reminders.get(user_id)
+
+    def next_due(self, user_id: int) -> Optional[float]:
+        return self._due.get(user_id)
+
+    async def enroll(self, user_id: int, tz: str, remind_at: dt.time, already_logged: bool = False) -> Optional[float]:
+        """Add or update a rep's reminder. ``already_logged``: the rep has a log for today on record
+        (e.g. logged before turning reminders on), so today's reminder is skipped."""
+        previous = self._reminders.get(user_id)
+        r = Reminder(user_id, tz, remind_at,
+                     previous.last_sent if previous else "", previous.last_logged if previous else "")
+        if already_logged:
+            r.last_logged = self._today(r)
+        await asyncio.to_thread(self.store.save, r)
+        self._reminders[user_id] = r
+        return self._schedule(r, self.clock())
+
+    async def remove(self, user_id: int):
+        await asyncio.to_thread(self.store.delete, user_id)
+        self._reminders.pop(user_id, None)
+        self._due.pop(user_id, None)      # its heap item goes stale
+
+    def logged_today(self, user_id: int) -> bool:
+        r = self._reminders.get(user_id)
+        return r is not None and r.last_logged == self._today(r)
+
+    async def mark_logged(self, user_id: int):
+        r = self._reminders.get(user_id)
+        if r is None:
+            return
+        day = self._today(r)
+        if r.last_logged == day:
+            return
+        r.last_logged = day
+        await asyncio.to_thread(self.store.mark_logged, user_id, day)
+        self._schedule(r, self.clock())
+
+    # ---------- Scheduling ----------
+    def _today(self, r: Reminder) -> str:
+        return dt.datetime.fromtimestamp(self.clock(), ZoneInfo(r.tz)).date().isoformat()
+
+    def _schedule(self, r: Reminder, now: float, catchup: bool = False) -> Optional[float]:
+        tz = ZoneInfo(r.tz)
+        today = dt.datetime.fromtimestamp(now, tz).date()
+        due = None
+        for offset in range(8):
+            day = today + dt.timedelta(days=offset)
+            if day.weekday() not in self.days or day.isoformat() in (r.last_sent, r.last_logged):
+                continue
+            at = dt.datetime.combine(day, r.remind_at, tzinfo=tz).timestamp()
+            if at > now:
+                due = at
+                break
+            if catchup and now - at <= self.catchup:
+                due = now
+                break
+        if due is None:
+            self._due.pop(r.user_id, None)
+            return None
+        self._due[r.user_id] = due
+        heapq.heappush(self._heaps.setdefault(r.tz, []), (due, r.user_id))
+        if self._sleep_until is None or due < self._sleep_until:
+            self._wake.set()    # only an earlier reminder needs the loop to re-plan
+        return due
+
+    def _next_wake(self) -> Optional[float]:
+        best = None
+        for heap in self._heaps.values():
+            while heap and self._due.get(heap[0][1]) != heap[0][0]:
+                heapq.heappop(heap)
+            if heap and (best is None or heap[0][0] < best):
+                best = heap[0][0]
+        return best
+
+    def _pop_due(self, now: float) -> list[int]:
+        out: list[int] = []
+        for heap in self._heaps.values():
+            while heap and heap[0][0] <= now and len(out) < self.batch_size:
+                due, user_id = heapq.heappop(heap)
+                if self._due.get(user_id) != due:
+                    continue
+                del self._due[user_id]
+                out.append(user_id)
+        return out
+
+    async def _run(self):
+        while True:
+            batch = self._pop_due(self.clock())
+            if batch:
+                try:
+                    await self._send_batch(batch)
+                except Exception as e:
+                    print("[reminders] Batch failed:", e)
+                continue
+            self._wake.clear()
+            nxt = self._next_wake()
+            # Wall-clock due times vs. a monotonic sleep: wake at least every 5 minutes to re-check
+            timeout = 300.0 if nxt is None else min(300.0, max(0.0, nxt - self.clock()))
+            self._sleep_until = self.clock() + timeout
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._sleep_until = None
+
+    async def _send_batch(self, user_ids: list[int]):
+        started = time.monotonic()
+        due: list[Reminder] = []
+        for user_id in user_ids:
+            r = self._reminders.get(user_id)
+            if r is None:
+                continue
+            if r.last_logged == self._today(r):
+                self._result("skipped")
+                self._schedule(r, self.clock())
+                continue
+            due.append(r)
+        if not due:
+            return
+
+        results = await asyncio.gather(*(self.send(r.user_id) for r in due), return_exceptions=True)
+        sent = []
+        for r, result in zip(due, results):
+            if isinstance(result, BaseException):
+                print(f"[reminders] DM to {r.user_id} failed:", result)
+            self._result("failed" if isinstance(result, BaseException) else "sent")
+            # Failures (e.g. DMs closed) count as sent too, so nobody is retried in a tight loop
+            r.last_sent = self._today(r)
+            sent.append((r.user_id, r.last_sent))
+            self._schedule(r, self.clock())
+        try:
+            await asyncio.to_thread(self.store.mark_sent, sent)
+        except Exception as e:
+            print("[reminders] Could not record sent reminders:", e)
+        # Pace batches so a big wave of reminders stays under ``rate`` DMs per second
+        await asyncio.sleep(max(0.0, len(due) / self.rate - (time.monotonic() - started)))
+
+    def _result(self, result: str):
+        if self.on_result:
+            self.on_result(result)
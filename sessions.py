@@ -0,0 +1,65 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any
+
+
+class SessionStore:
+    """Checkpoints of in-progress daily logs, one row per user, so flows survive restarts.
+
+    Methods are blocking; call them through ``asyncio.to_thread`` from the event loop.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_id INTEGER PRIMARY KEY,
+                channel_id INTEGER NOT NULL,
+                answers TEXT NOT NULL,
+                updated REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+
+    def save(self, user_id: int, channel_id: int, answers: Dict[str, Any]):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (user_id, channel_id, answers, updated) VALUES (?, ?, ?, ?)",
+                (user_id, channel_id, json.dumps(answers, separators=(",", ":")), time.time()),
+            )
+
+    def load(self, user_id: int) -> Optional[tuple[int, Dict[str, Any]]]:
+        """(channel_id, answers) for a live session, or None if absent or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT channel_id, answers FROM sessions WHERE user_id = ? AND updated >= ?",
+                (user_id, time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def delete(self, user_id: int):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - self.ttl,)).rowcount
+
+    def user_ids(self) -> set[int]:
+        with self._lock:
+            return {row[0] for row in self._db.execute("SELECT user_id FROM sessions")}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
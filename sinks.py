@@ -0,0 +1,97 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+
+@dataclass
+class Sink:
+    """One destination for a finished log.
+
+    ``required`` sinks decide whether the log counts as accepted (the rep is told it was saved
+    once they all succeed). Other sinks are best-effort and never delay the confirmation;
+    ``after_accept`` ones (e.g. public echoes) only start once the log was accepted.
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[None]]
+    timeout: float = 10.0
+    required: bool = False
+    after_accept: bool = False
+
+
+@dataclass
+class SinkStats:
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+@dataclass
+class SinkResult:
+    name: str
+    ok: bool
+    ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class SinkPipeline:
+    """Fans a log out to every sink concurrently, each with its own timeout and error isolation."""
+    sinks: list[Sink]
+    on_result: Optional[Callable[[SinkResult], None]] = None
+    stats: Dict[str, SinkStats] = field(default_factory=dict)
+    _background: set = field(default_factory=set)
+
+    async def _run_one(self, sink: Sink, payload: Any) -> SinkResult:
+        t0 = time.perf_counter()
+        error = None
+        stats = self.stats.setdefault(sink.name, SinkStats())
+        try:
+            await asyncio.wait_for(sink.handler(payload), timeout=sink.timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {sink.timeout:g}s"
+            stats.timeouts += 1
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        ms = (time.perf_counter() - t0) * 1000
+        stats.calls += 1
+        stats.total_ms += ms
+        stats.max_ms = max(stats.max_ms, ms)
+        if error:
+            stats.failures += 1
+            stats.last_error = error
+            print(f"[sinks] {sink.name} failed after {ms:.1f} ms: {error}")
+        result = SinkResult(sink.name, error is None, ms, error)
+        if self.on_result:
+            self.on_result(result)
+        return result
+
+    def _spawn(self, sinks: list[Sink], payload: Any):
+        for sink in sinks:
+            task = asyncio.create_task(self._run_one(sink, payload), name=f"sink-{sink.name}")
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def submit(self, payload: Any) -> list[SinkResult]:
+        """Run the required sinks and return their results as soon as they finish.
+
+        Best-effort sinks start at the same time and keep running in the background.
+        """
+        required = [s for s in self.sinks if s.required]
+        self._spawn([s for s in self.sinks if not s.required and not s.after_accept], payload)
+        results = list(await asyncio.gather(*(self._run_one(s, payload) for s in required)))
+        if all(r.ok for r in results):
+            self._spawn([s for s in self.sinks if s.after_accept], payload)
+        return results
+
+    async def drain(self, timeout: float = 10.0):
+        """Wait for in-flight background sinks (e.g. before closing the files they write to)."""
+        if self._background:
+            await asyncio.wait(set(self._background), timeout=timeout)
@@ -0,0 +1,243 @@
+import datetime as dt
+import json
+import sqlite3
+import threading
+from typing import Optional, Dict, Any
+
+
+# Rollup column -> DailyTotals field it sums
+ROLLUP_METRICS: Dict[str, str] = {
+    "knocks": "knocks_total",
+    "presentations_no_sale": "presentations_no_sale",
+    "not_interested": "not_interested",
+    "sales": "sales_count",
+    "ap": "ap_amount",
+    "dials": "dials_made",
+    "appts": "appts_booked_total",
+    "appts_from_dials": "appts_booked_from_dials",
+    "cold_knocks": "cold_knocks_total",
+    "cold_sales": "cold_sales_count",
+    "cold_ap": "cold_ap_amount",
+    "cold_appts": "cold_appts_booked",
+    "lead_knocks": "lead_knocks_total",
+    "lead_sales": "lead_sales_count",
+    "lead_ap": "lead_ap_amount",
+    "lead_appts": "lead_appts_booked",
+}
+PERIODS = ("day", "week", "month")
+
+
+def period_start(period: str, day: dt.date) -> str:
+    if period == "week":
+        return (day - dt.timedelta(days=day.weekday())).isoformat()   # ISO weeks start Monday
+    if period == "month":
+        return day.replace(day=1).isoformat()
+    return day.isoformat()
+
+
+class ActivityStore:
+    """Local SQLite history of every submitted log, with per-user day/week/month rollups.
+
+    Rollups are updated in the same transaction as each insert, so /stats and /leaderboard
+    read a handful of pre-aggregated rows instead of scanning history. A log that replaces the
+    rep's earlier log for the same day marks that one ``superseded`` and takes it out of the rollups.
+    Methods are blocking; call them through ``asyncio.to_thread`` from the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS activities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                user_id TEXT NOT NULL,
+                display_name TEXT NOT NULL,
+                work_date TEXT NOT NULL,
+                timestamp_utc TEXT NOT NULL,
+                knocks_category TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                content_hash TEXT NOT NULL DEFAULT '',
+                superseded INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Databases created before same-day replacement existed
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(activities)")}
+        if "content_hash" not in existing:
+            self._db.execute("ALTER TABLE activities ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''")
+        if "superseded" not in existing:
+            self._db.execute("ALTER TABLE activities ADD COLUMN superseded INTEGER NOT NULL DEFAULT 0")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < 1:
+            # Older builds stored the webhook secret inside each payload; strip it once
+            try:
+                self._db.execute("UPDATE activities SET payload = json_remove(payload, '$.auth_secret') "
+                                 "WHERE json_extract(payload, '$.auth_secret') IS NOT NULL")
+            except sqlite3.OperationalError as e:
+                print("[store] Could not strip auth_secret from stored logs:", e)    # SQLite built without JSON
+            else:
+                self._db.execute("PRAGMA user_version = 1")
+        self._db.execute("CREATE INDEX IF NOT EXISTS activities_user ON activities (user_id, work_date)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS activities_date ON activities (work_date)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS activities_category ON activities (knocks_category, work_date)")
+        metric_cols = ", ".join(f"{m} REAL NOT NULL DEFAULT 0" for m in ROLLUP_METRICS)
+        self._db.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS rollups (
+                period TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                display_name TEXT NOT NULL,
+                logs INTEGER NOT NULL DEFAULT 0,
+                {metric_cols},
+                PRIMARY KEY (period, period_start, user_id)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS rollups_user ON rollups (user_id, period, period_start)")
+        cols = ", ".join(["logs", *ROLLUP_METRICS])
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in ["logs", *ROLLUP_METRICS])
+        self._upsert_rollup = (
+            f"INSERT INTO rollups (period, period_start, user_id, display_name, {cols}) "
+            f"VALUES (?, ?, ?, ?, {', '.join('?' for _ in range(len(ROLLUP_METRICS) + 1))}) "
+            f"ON CONFLICT (period, period_start, user_id) DO UPDATE SET display_name = excluded.display_name, {updates}"
+        )
+
+    def insert(self, data: Dict[str, Any], work_date: dt.date) -> bool:
+        """Store one DailyTotals dict and fold it into its rollups. False if the key was already stored.
+
+        With ``supersedes_key`` set, the rep's other logs for ``work_date`` are superseded (a log
+        superseded earlier comes back if the same key is sent again).
+        """
+        payload = json.dumps(data, separators=(",", ":"))
+        replaces = bool(data.get("supersedes_key"))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._db.execute(
+                    "INSERT OR IGNORE INTO activities "
+                    "(idempotency_key, user_id, display_name, work_date, timestamp_utc, knocks_category, payload, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        data["idempotency_key"], data["discord_user_id"], data["discord_display_name"],
+                        work_date.isoformat(), data["timestamp_utc"], data["knocks_category"],
+                        payload, data.get("content_hash") or "",
+                    ),
+                )
+                row_id = cur.lastrowid if cur.rowcount == 1 else None
+                if row_id is None and replaces:
+                    row = self._db.execute(
+                        "SELECT id FROM activities WHERE idempotency_key = ? AND superseded = 1", (data["idempotency_key"],)
+                    ).fetchone()
+                    if row:
+                        row_id = row[0]
+                        self._db.execute(
+                            "UPDATE activities SET superseded = 0, payload = ?, timestamp_utc = ? WHERE id = ?",
+                            (payload, data["timestamp_utc"], row_id),
+                        )
+                if row_id is not None:
+                    if replaces:
+                        self._supersede(data["discord_user_id"], work_date, keep=row_id)
+                    self._apply_rollups(data, work_date, sign=1)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return row_id is not None
+
+    def _supersede(self, user_id: str, work_date: dt.date, keep: int):
+        rows = self._db.execute(
+            "SELECT id, payload FROM activities WHERE user_id = ? AND work_date = ? AND superseded = 0 AND id != ?",
+            (user_id, work_date.isoformat(), keep),
+        ).fetchall()
+        for _, payload in rows:
+            self._apply_rollups(json.loads(payload), work_date, sign=-1)
+        self._db.executemany("UPDATE activities SET superseded = 1 WHERE id = ?", [(row_id,) for row_id, _ in rows])
+
+    def latest_for_day(self, user_id: str, work_date: str) -> Optional[tuple[str, str]]:
+        """(content_hash, idempotency_key) of the rep's current log for ``work_date``, if any."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT content_hash, idempotency_key FROM activities "
+                "WHERE user_id = ? AND work_date = ? AND superseded = 0 ORDER BY id DESC LIMIT 1",
+                (user_id, work_date),
+            ).fetchone()
+
+    def _apply_rollups(self, data: Dict[str, Any], work_date: dt.date, sign: int):
+        values = [sign] + [sign * (data.get(field) or 0) for field in ROLLUP_METRICS.values()]
+        self._db.executemany(
+            self._upsert_rollup,
+            [
+                (period, period_start(period, work_date), data["discord_user_id"], data["discord_display_name"], *values)
+                for period in PERIODS
+            ],
+        )
+
+    def iter_logs(self, start: Optional[str], end: Optional[str], batch: int = 500):
+        """Current (not superseded) logs with ``start <= work_date < end`` as DailyTotals dicts, oldest first.
+
+        Pages through by id so the lock is only held per batch. Blocking generator; run it in a thread.
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT id, payload FROM activities WHERE id > ? AND superseded = 0 "
+                    "AND work_date >= ? AND work_date < ? ORDER BY id LIMIT ?",
+                    (last_id, start or "", end or "9999-12-31", batch),
+                ).fetchall()
+            if not rows:
+                return
+            for row_id, payload in rows:
+                yield json.loads(payload)
+            last_id = rows[-1][0]
+
+    # ---------- Queries (rollups only) ----------
+    def user_totals(self, user_id: str, period: Optional[str], start: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Totals for one user: a single rollup row, or the sum of monthly rollups when ``period`` is None
+        (``start`` then bounds the months, e.g. the first of the year)."""
+        cols = ", ".join(f"SUM({c}) AS {c}" for c in ["logs", *ROLLUP_METRICS])
+        with self._lock:
+            self._db.row_factory = sqlite3.Row
+            try:
+                if period:
+                    row = self._db.execute(
+                        f"SELECT {cols} FROM rollups WHERE user_id = ? AND period = ? AND period_start = ?",
+                        (user_id, period, start),
+                    ).fetchone()
+                else:
+                    row = self._db.execute(
+                        f"SELECT {cols} FROM rollups WHERE user_id = ? AND period = 'month' AND period_start >= ?",
+                        (user_id, start or ""),
+                    ).fetchone()
+            finally:
+                self._db.row_factory = None
+        if row is None or not row["logs"]:
+            return None
+        return dict(row)
+
+    def leaderboard(self, metric: str, period: Optional[str], start: Optional[str], limit: int = 10) -> list[tuple[str, str, float]]:
+        """(user_id, display_name, value) ranked by ``metric``; same ``period``/``start`` rules as user_totals."""
+        if metric not in ROLLUP_METRICS and metric != "logs":
+            raise ValueError(f"unknown metric {metric!r}")
+        with self._lock:
+            if period:
+                return self._db.execute(
+                    f"SELECT user_id, display_name, {metric} FROM rollups "
+                    f"WHERE period = ? AND period_start = ? AND {metric} > 0 ORDER BY {metric} DESC LIMIT ?",
+                    (period, start, limit),
+                ).fetchall()
+            return self._db.execute(
+                f"SELECT user_id, MAX(display_name), SUM({metric}) AS total FROM rollups "
+                f"WHERE period = 'month' AND period_start >= ? GROUP BY user_id HAVING total > 0 "
+                f"ORDER BY total DESC LIMIT ?",
+                (start or "", limit),
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# The bot's modules live at the repo root (no package), same as for the bench scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import activities  # noqa: E402
+
+# A complete day's answers, as the DM flow collects them
+VALUES = {
+    "start_time": "9:00 AM", "end_time": "5:30 PM", "knocks_total": 40, "knocks_category": "CODENOX",
+    "presentations_no_sale": 3, "not_interested": 12, "sales_count": 2, "ap_amount": 1243.5, "carrier": "Aetna",
+    "dials_made": 30, "appts_booked_total": 4, "appts_booked_from_dials": 2, "had_cold": False, "had_leads": False,
+}
+
+
+class FakeDM:
+    """Stands in for a DM channel; keeps what the bot sent."""
+
+    def __init__(self, channel_id: int = 1):
+        self.id = channel_id
+        self.sent: list[str] = []
+
+    async def send(self, content, **kwargs):
+        self.sent.append(content)
+
+
+@pytest.fixture
+def values() -> dict:
+    return dict(VALUES)
+
+
+@pytest.fixture
+def user() -> SimpleNamespace:
+    return SimpleNamespace(id=42, name="rep", display_name="Rep")
+
+
+@pytest.fixture
+def dm() -> FakeDM:
+    return FakeDM()
+
+
+@pytest.fixture
+def cog(monkeypatch):
+    """An ActivityCog with no bot behind it (cog_load not run): a webhook URL that tests stub out,
+    no CSV fallback and no log channel."""
+    monkeypatch.setattr(activities, "WEBHOOK_URL", "http://webhook.invalid/hook")
+    monkeypatch.setattr(activities, "CSV_FALLBACK_PATH", "")
+    monkeypatch.setattr(activities, "LOG_CHANNEL_ID", 0)
+    cog = activities.ActivityCog(SimpleNamespace())
+    yield cog
+    if cog._http is not None and not cog._http.closed:
+        asyncio.run(cog._http.close())
+
+
+@pytest.fixture
+def submit(dm, user):
+    """Run one log through ``cog._submit`` and wait for its sinks; returns the bot's last DM."""
+    async def submit(cog: activities.ActivityCog, values: dict) -> str:
+        await cog._submit(dm, user, dict(values))
+        await cog.pipeline.drain()
+        return dm.sent[-1]
+    return submit
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from discord import app_commands
+
+import activities
+from outbox import Outbox, OutboxWorker
+from reminders import ReminderScheduler, ReminderStore
+from store import ActivityStore
+
+
+@pytest.fixture
+def stored_cog(cog, tmp_path) -> activities.ActivityCog:
+    """The cog with a real activity store behind its dedupe index."""
+    cog.store = ActivityStore(os.path.join(tmp_path, "activity.sqlite3"))
+    cog.dedupe.loader = cog._accepted_for_day
+    yield cog
+    cog.store.close()
+
+
+def _add_outbox(cog: activities.ActivityCog, tmp_path) -> activities.ActivityCog:
+    # Never started: records stay queued so the test can look at them
+    cog.outbox = OutboxWorker(Outbox(os.path.join(tmp_path, "outbox.sqlite3")), cog._post_webhook,
+                              on_dead_letter=cog._on_dead_letter)
+    return cog
+
+
+def _cold_cache(cog: activities.ActivityCog):
+    # As after a restart: only the store knows about earlier logs
+    cog.dedupe = activities.DedupeIndex(16, 60, cog._accepted_for_day)
+
+
+def _queued(cog: activities.ActivityCog) -> list[tuple[str, str, int]]:
+    rows = cog.outbox.outbox._db.execute("SELECT idempotency_key, payload, dead FROM outbox ORDER BY id").fetchall()
+    return [(key, json.loads(payload)["supersedes_key"], dead) for key, payload, dead in rows]
+
+
+def test_going_back_to_earlier_numbers_queues_a_new_revision(stored_cog, tmp_path, submit, values):
+    cog = _add_outbox(stored_cog, tmp_path)
+    b = dict(values, sales_count=3)
+
+    async def run():
+        return [await submit(cog, v) for v in (values, b, values)]
+
+    replies = asyncio.run(run())
+    assert replies[1].startswith("♻️") and replies[2].startswith("♻️")
+    queued = _queued(cog)
+    keys = [key for key, _, _ in queued]
+    assert len(set(keys)) == 3
+    assert keys[1].endswith("-r2") and keys[2].endswith("-r3")
+    assert [supersedes for _, supersedes, _ in queued] == ["", keys[0], keys[1]]
+    assert cog.store.latest_for_day("42", activities.local_today().isoformat())[1] == keys[2]
+
+
+def test_retry_after_failed_delivery_is_sent_again(stored_cog, submit, values):
+    cog = stored_cog
+    posted: list[str] = []
+    outcomes = iter([(False, "Cannot connect to host"), (True, None)])
+
+    async def post(data):
+        posted.append(data["idempotency_key"])
+        return next(outcomes)
+
+    cog._post_webhook = post
+
+    async def run():
+        first = await submit(cog, values)
+        _cold_cache(cog)
+        return first, await submit(cog, values)
+
+    first, second = asyncio.run(run())
+    assert first.startswith("❌")
+    assert second.startswith("**Daily Log Saved**")
+    assert len(posted) == 2
+
+
+@pytest.mark.parametrize("cold_cache", [False, True])
+def test_dead_lettered_log_is_not_treated_as_logged(stored_cog, tmp_path, submit, values, cold_cache):
+    cog = _add_outbox(stored_cog, tmp_path)
+
+    async def run():
+        await submit(cog, values)
+        row_id, data, attempts = cog.outbox.outbox.due(float("inf"), 1)[0]
+        await cog.outbox._fail(row_id, data, attempts + 1, "HTTP 400: bad payload", permanent=True)
+        if cold_cache:
+            _cold_cache(cog)
+        again = await submit(cog, values)
+        _cold_cache(cog)
+        return again, await submit(cog, values)
+
+    again, third = asyncio.run(run())
+    assert again.startswith("♻️")
+    assert third.startswith("✅ Already logged")
+    queued = _queued(cog)
+    assert [dead for _, _, dead in queued] == [1, 0]
+    assert queued[1][1] == queued[0][0]
+
+
+class _Interaction:
+    def __init__(self, user):
+        self.user = user
+        self.response = SimpleNamespace(send_message=self._reply)
+        self.replies: list[str] = []
+
+    async def _reply(self, content, **kwargs):
+        self.replies.append(content)
+
+
+def test_reminders_skip_today_when_the_rep_already_logged(stored_cog, tmp_path, submit, values, user):
+    cog = stored_cog
+
+    async def post(data):
+        return True, None
+
+    cog._post_webhook = post
+
+    async def run():
+        await submit(cog, values)
+        _cold_cache(cog)
+        cog.reminders = ReminderScheduler(ReminderStore(os.path.join(tmp_path, "reminders.sqlite3")), None, days=set(range(7)))
+        interaction = _Interaction(user)
+        on = app_commands.Choice(name="on", value="on")
+        await activities.ActivityCog.reminders_slash.callback(cog, interaction, on, "6:00 PM", activities.LOCAL_TIMEZONE)
+        return interaction.replies
+
+    replies = asyncio.run(run())
+    assert replies[-1].startswith("🔔")
+    assert cog.reminders.logged_today(user.id)
+    cog.reminders.store.close()
+
+
+def test_store_keeps_logs_without_the_webhook_secret(monkeypatch, stored_cog, tmp_path, submit, values):
+    monkeypatch.setattr(activities, "WEBHOOK_AUTH_SECRET", "s3cret")
+    cog = _add_outbox(stored_cog, tmp_path)
+
+    asyncio.run(submit(cog, values))
+    queued = cog.outbox.outbox._db.execute("SELECT payload FROM outbox").fetchone()[0]
+    stored = cog.store._db.execute("SELECT payload FROM activities").fetchone()[0]
+    assert json.loads(queued)["auth_secret"] == "s3cret"
+    assert "auth_secret" not in json.loads(stored)
+
+
+def test_store_strips_secrets_saved_by_older_builds(tmp_path, values):
+    path = os.path.join(tmp_path, "activity.sqlite3")
+    store = ActivityStore(path)
+    payload = activities.make_payload("42", "Rep", "2026-10-17T15:00:00Z", values)
+    store.insert(dict(activities.asdict(payload), auth_secret="s3cret"), activities.work_date(payload))
+    store._db.execute("PRAGMA user_version = 0")
+    store.close()
+
+    store = ActivityStore(path)
+    assert [sorted(log) for log in store.iter_logs(None, None)] == [sorted(activities.stored_log(payload))]
+    store.close()
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+import activities
+from conversations import FlowBusy, FlowManager
+
+
+async def _noop(position: int):
+    pass
+
+
+def test_admit_replaces_racing_flows_one_at_a_time():
+    async def run():
+        flows = FlowManager(max_active=10, queue_timeout=5, idle_evict=0)
+        running: list[str] = []
+
+        async def flow(name: str):
+            entry = await flows.admit(7, _noop, replace=True)
+            running.append(name)
+            try:
+                await asyncio.sleep(3600)
+            finally:
+                running.remove(name)
+                flows.release(entry)
+
+        tasks = [asyncio.create_task(flow(n)) for n in ("old", "a", "b")]
+        await asyncio.sleep(0.05)
+        state = (flows.active, list(running), flows.get(7).task is tasks[-1])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return state, flows.active
+
+    (active, running, latest_wins), after = asyncio.run(run())
+    assert active == 1
+    assert running == ["b"]
+    assert latest_wins
+    assert after == 0
+
+
+def test_admit_rejects_a_second_flow_without_replace():
+    async def run():
+        flows = FlowManager(max_active=10, queue_timeout=5, idle_evict=0)
+        first = await flows.admit(7, _noop)
+        with pytest.raises(FlowBusy) as busy:
+            await flows.admit(7, _noop)
+        return first, busy.value.entry, flows.active
+
+    first, busy_entry, active = asyncio.run(run())
+    assert busy_entry is first
+    assert active == 1
+
+
+def test_double_submitted_form_runs_one_flow(cog, dm, user):
+    async def create_dm():
+        await asyncio.sleep(0)
+        return dm
+
+    user.create_dm = create_dm
+
+    async def run():
+        # Only the start time: both flows stop at the next question
+        prefill = {"start_time": "9:00 AM"}
+        first = asyncio.create_task(cog._start_flow(user, prefill=dict(prefill)))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(cog._start_flow(user, prefill=dict(prefill)))
+        third = asyncio.create_task(cog._start_flow(user, prefill=dict(prefill)))
+        await asyncio.sleep(0.05)
+        state = (cog.flows.active, len(cog.router))
+        for task in (first, second, third):
+            task.cancel()
+        await asyncio.gather(first, second, third, return_exceptions=True)
+        return state, cog.flows.active
+
+    (active, conversations), after = asyncio.run(run())
+    assert active == 1
+    assert conversations == 1
+    assert after == 0
+
+
+def test_pasted_block_leaves_cold_and_lead_questions_to_the_flow():
+    values, errors = activities.parse_log_block("Start time: 9am\nnox: 40")
+    assert errors == []
+    assert "had_cold" not in values and "had_leads" not in values
+    pending = [f.key for f in activities.ActivityCog._pending_fields(None, values)]
+    assert "had_cold" in pending and "had_leads" in pending
+    # Including a section's field answers its question
+    values, _ = activities.parse_log_block("cold_knocks_total: 5")
+    assert values["had_cold"] is True and "had_leads" not in values
+
+
+def test_quick_log_options_default_sections_to_no():
+    values, _ = activities.parse_log_pairs([("knocks_total", 40), ("cold_knocks_total", None)], sections_default_no=True)
+    assert values == {"knocks_total": 40, "had_cold": False, "had_leads": False}
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import activities
+from bulk import read_csv_logs
+from csv_sink import CsvSink
+from digest import LogDigest
+from sinks import Sink, SinkPipeline
+
+
+
+def _recorder(calls: list, delay: float = 0.0, error: str = ""):
+    async def handler(payload):
+        await asyncio.sleep(delay)
+        if error:
+            raise RuntimeError(error)
+        calls.append(payload)
+    return handler
+
+
+def test_after_accept_sinks_skip_failed_logs():
+    accepted: list = []
+
+    async def run():
+        pipeline = SinkPipeline([
+            Sink("webhook", _recorder([], error="HTTP 503"), required=True),
+            Sink("store", _recorder(accepted), after_accept=True),
+        ])
+        results = await pipeline.submit("log")
+        await pipeline.drain()
+        return results
+
+    results = asyncio.run(run())
+    assert [r.ok for r in results] == [False]
+    assert results[0].error == "HTTP 503"
+    assert accepted == []
+
+
+def test_after_accept_sinks_run_once_accepted():
+    accepted: list = []
+
+    async def run():
+        pipeline = SinkPipeline([
+            Sink("webhook", _recorder([]), required=True),
+            Sink("store", _recorder(accepted), after_accept=True),
+        ])
+        await pipeline.submit("log")
+        await pipeline.drain()
+
+    asyncio.run(run())
+    assert accepted == ["log"]
+
+
+def test_best_effort_sinks_do_not_delay_or_fail_the_log():
+    async def run():
+        pipeline = SinkPipeline([
+            Sink("webhook", _recorder([]), required=True),
+            Sink("slow", _recorder([], delay=0.5), timeout=1),
+            Sink("broken", _recorder([], error="disk full")),
+        ])
+        t0 = time.perf_counter()
+        results = await pipeline.submit("log")
+        elapsed = time.perf_counter() - t0
+        await pipeline.drain()
+        return results, elapsed, pipeline.stats
+
+    results, elapsed, stats = asyncio.run(run())
+    assert [r.ok for r in results] == [True]
+    assert elapsed < 0.25
+    assert stats["broken"].failures == 1
+    assert stats["slow"].failures == 0
+
+
+def test_required_sink_timeout_fails_the_log():
+    async def run():
+        pipeline = SinkPipeline([Sink("webhook", _recorder([], delay=1), timeout=0.05, required=True)])
+        return await pipeline.submit("log")
+
+    results = asyncio.run(run())
+    assert not results[0].ok
+    assert "timed out" in results[0].error
+
+
+def _stub_store_and_webhook(cog: activities.ActivityCog, delivered: bool) -> list:
+    """Stub the webhook's answer; returns the keys the store is asked to insert."""
+    inserted: list = []
+
+    async def deliver(payload):
+        return (True, None) if delivered else (False, "HTTP 503: unavailable")
+
+    cog._deliver = deliver
+    cog.store = SimpleNamespace(insert=lambda data, day: inserted.append(data["idempotency_key"]))
+    return inserted
+
+
+def test_store_skips_logs_the_webhook_rejected(cog, submit, values):
+    inserted = _stub_store_and_webhook(cog, delivered=False)
+    reply = asyncio.run(submit(cog, values))
+    assert reply.startswith("❌")
+    assert inserted == []
+
+
+def test_store_records_accepted_logs(cog, submit, values):
+    inserted = _stub_store_and_webhook(cog, delivered=True)
+    reply = asyncio.run(submit(cog, values))
+    assert reply.startswith("**Daily Log Saved**")
+    assert len(inserted) == 1
+
+
+def test_csv_sink_starts_a_new_file_when_the_header_changed(tmp_path):
+    path = os.path.join(tmp_path, "logs.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write("discord_user_id,auth_secret\r\n42,old-secret\r\n")
+    sink = CsvSink(path, ["discord_user_id", "content_hash", "auth_secret"])
+    sink.write(["43", "abc", "new-secret"])
+    sink.close()
+
+    assert sorted(os.listdir(tmp_path))[0].startswith("logs-")
+    assert list(read_csv_logs(path)) == [
+        {"discord_user_id": "42", "auth_secret": "old-secret"},
+        {"discord_user_id": "43", "content_hash": "abc", "auth_secret": "new-secret"},
+    ]
+
+
+def test_csv_sink_appends_under_a_matching_header(tmp_path):
+    path = os.path.join(tmp_path, "logs.csv")
+    for user in ("42", "43"):
+        sink = CsvSink(path, ["discord_user_id"])
+        sink.write([user])
+        sink.close()
+    assert os.listdir(tmp_path) == ["logs.csv"]
+    assert [r["discord_user_id"] for r in read_csv_logs(path)] == ["42", "43"]
+
+
+def test_digest_counts_a_corrected_log_once(values):
+    sent: list[str] = []
+
+    async def send(text):
+        sent.append(text)
+
+    def log(knocks: int, timestamp: str, supersedes: str = "") -> activities.DailyTotals:
+        payload = activities.make_payload("42", "Rep", timestamp, dict(values, knocks_total=knocks))
+        payload.supersedes_key = supersedes
+        return payload
+
+    async def run():
+        digest = LogDigest(send, interval=3600, max_entries=10, key=lambda p: (p.discord_user_id, activities.work_date(p)))
+        first = log(40, "2026-10-17T15:00:00Z")
+        digest.add(first)
+        digest.add(log(45, "2026-10-17T16:00:00Z", supersedes=first.idempotency_key))
+        digest.add(log(30, "2026-10-18T15:00:00Z"))
+        await digest.flush()
+
+    asyncio.run(run())
+    assert "2 new logs" in sent[0]
+    assert "NOx **75**" in sent[-1]